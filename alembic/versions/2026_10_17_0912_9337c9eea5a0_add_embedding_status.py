@@ -0,0 +1,46 @@
+"""add_embedding_status
+
+Revision ID: 9337c9eea5a0
+Revises: 2cc826f9c8fa
+Create Date: 2026-10-17 09:12:41.220518+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9337c9eea5a0'
+down_revision: Union[str, None] = '2cc826f9c8fa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # New tasks start as pending until the background indexer embeds them
+    op.add_column('tasks',
+                  sa.Column('embedding_status', sa.String(),
+                            nullable=False, server_default='pending')
+                  )
+
+    # Existing rows that already have an embedding are done
+    op.execute("UPDATE tasks SET embedding_status = 'ready' WHERE embedding IS NOT NULL")
+
+    op.create_check_constraint(
+        'tasks_embedding_status_values',
+        'tasks',
+        "embedding_status IN ('pending', 'ready', 'failed')"
+    )
+
+    # Small partial index so reindexing finds unembedded tasks without a full scan
+    op.execute(
+        "CREATE INDEX idx_tasks_embedding_not_ready ON tasks (id) WHERE embedding_status <> 'ready'"
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP INDEX IF EXISTS idx_tasks_embedding_not_ready')
+    op.drop_constraint('tasks_embedding_status_values', 'tasks')
+    op.drop_column('tasks', 'embedding_status')
@@ -0,0 +1,85 @@
+"""consolidate_search_vector_maintenance
+
+Revision ID: b7e3c5a90d14
+Revises: 9337c9eea5a0
+Create Date: 2026-10-17 13:42:06.918245+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3c5a90d14'
+down_revision: Union[str, None] = '9337c9eea5a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+WEIGHTED_SEARCH_VECTOR = """
+    setweight(to_tsvector('english', coalesce({row}name, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({row}category, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce({row}priority, '')), 'C')
+"""
+
+
+def upgrade() -> None:
+    # Two triggers rebuilt search_vector on every write (the second, unweighted one
+    # overwrote the first) and two GIN indexes covered the same column
+    op.execute('DROP TRIGGER IF EXISTS tasks_search_vector_update ON tasks')
+    op.execute('DROP TRIGGER IF EXISTS tasks_search_vector_trigger ON tasks')
+    op.execute('DROP INDEX IF EXISTS idx_tasks_search_gin')
+
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION tasks_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {WEIGHTED_SEARCH_VECTOR.format(row='NEW.')};
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Recompute only when a searched column actually changes, so embedding and
+    # status updates (the bulk of writes) skip the tsvector and GIN work entirely.
+    # A STORED generated column would be recomputed on every UPDATE of the row.
+    op.execute("""
+        CREATE TRIGGER tasks_search_vector_on_insert
+            BEFORE INSERT ON tasks
+            FOR EACH ROW
+            EXECUTE FUNCTION tasks_search_vector_update()
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_search_vector_on_update
+            BEFORE UPDATE OF name, category, priority ON tasks
+            FOR EACH ROW
+            WHEN (OLD.name IS DISTINCT FROM NEW.name
+                  OR OLD.category IS DISTINCT FROM NEW.category
+                  OR OLD.priority IS DISTINCT FROM NEW.priority)
+            EXECUTE FUNCTION tasks_search_vector_update()
+    """)
+
+    # Existing rows hold the unweighted vector written by the trigger that ran last
+    op.execute(f"UPDATE tasks SET search_vector = {WEIGHTED_SEARCH_VECTOR.format(row='')}")
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS tasks_search_vector_on_update ON tasks')
+    op.execute('DROP TRIGGER IF EXISTS tasks_search_vector_on_insert ON tasks')
+
+    op.execute('CREATE INDEX IF NOT EXISTS idx_tasks_search_gin ON tasks USING GIN(search_vector)')
+    op.execute("""
+        CREATE TRIGGER tasks_search_vector_trigger
+            BEFORE INSERT OR UPDATE ON tasks
+            FOR EACH ROW
+            EXECUTE FUNCTION tasks_search_vector_update();
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_search_vector_update
+            BEFORE INSERT OR UPDATE ON tasks
+            FOR EACH ROW
+            EXECUTE FUNCTION
+                tsvector_update_trigger(
+                    search_vector, 'pg_catalog.english',
+                    name, category, priority
+                )
+    """)
@@ -0,0 +1,165 @@
+"""
+Maintenance commands.
+
+Usage:
+    python -m api.cli reindex-missing [--workers 8]
+    python -m api.cli backfill-embeddings [--all] [--batch-size 256] [--concurrency 4] [--reindex]
+    python -m api.cli resize-embeddings --confirm [--dimension 384]
+    python -m api.cli export-tasks [--output tasks.ndjson | tasks.parquet] [--no-embeddings]
+    python -m api.cli import-tasks tasks.ndjson [--parse]
+
+Parquet files need pyarrow: pip install -r requirements-parquet.txt
+"""
+import argparse
+import asyncio
+import sys
+
+from api.config import get_settings
+from api.services.embedding_backfill import (
+    BackfillProgress,
+    backfill_embeddings,
+    embedding_column_dimension,
+    rebuild_embedding_index,
+    resize_embedding_column
+)
+from api.services.embedding_backends import close_embedding_backend
+from api.services.embedding_service import EmbeddingService
+from api.services.indexing_queue import IndexingQueue, reindex_missing
+from api.services.llm_service import LLMService
+from api.services.openai_client import close_async_openai_client
+from api.services.transfer_service import TaskTransferService, iter_rows, read_parquet_rows, write_parquet
+from api.utils.log import configure_logging
+
+
+async def run_reindex_missing(args: argparse.Namespace) -> None:
+    """Embeds and indexes every task whose embedding is pending or failed"""
+    queue = IndexingQueue(EmbeddingService(), workers=args.workers)
+    if queue.mode == "inline":
+        # Process here with a worker pool rather than one task at a time
+        queue.mode = "asyncio"
+
+    await queue.start()
+    count = await reindex_missing(queue)
+    print(f"Enqueued {count} tasks for indexing ({queue.mode} mode)")
+    await queue.join()
+    await queue.stop()
+    await close_async_openai_client()
+    await close_embedding_backend()
+
+
+def print_progress(progress: BackfillProgress) -> None:
+    eta = progress.eta_seconds
+    eta_text = f"{int(eta // 60)}m{int(eta % 60):02d}s" if eta is not None else "?"
+    print(f"{progress.done}/{progress.total} tasks  {progress.rows_per_second:.1f} rows/s  ETA {eta_text}")
+
+
+async def run_backfill_embeddings(args: argparse.Namespace) -> None:
+    """Re-embeds tasks in batches, resuming from the checkpoint file if one exists"""
+    checkpoint = await backfill_embeddings(
+        EmbeddingService(),
+        checkpoint_path=args.checkpoint,
+        only_missing=not args.all,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        on_progress=print_progress
+    )
+    print(f"Embedded {checkpoint.embedded} tasks, {checkpoint.failed} failed (model {checkpoint.model})")
+    if args.reindex:
+        print("Rebuilding task_embedding_idx")
+        await rebuild_embedding_index()
+    await close_async_openai_client()
+    await close_embedding_backend()
+
+
+async def run_resize_embeddings(args: argparse.Namespace) -> None:
+    """Resizes tasks.embedding to EMBEDDING_DIMENSION (or --dimension), clearing stored embeddings"""
+    dimension = args.dimension or get_settings().EMBEDDING_DIMENSION
+    current = await embedding_column_dimension()
+    if current == dimension:
+        print(f"tasks.embedding is already vector({dimension})")
+        return
+    if not args.confirm:
+        print(f"This changes tasks.embedding from vector({current}) to vector({dimension}) and deletes "
+              f"every stored embedding. Re-run with --confirm to proceed.", file=sys.stderr)
+        sys.exit(1)
+
+    await resize_embedding_column(dimension)
+    print(f"Resized tasks.embedding to vector({dimension}); run backfill-embeddings to re-embed all tasks")
+
+
+def _is_parquet(path: str) -> bool:
+    return path.endswith(".parquet")
+
+
+async def run_export_tasks(args: argparse.Namespace) -> None:
+    """Writes every task to NDJSON (stdout by default) or, for *.parquet, a Parquet file"""
+    chunks = TaskTransferService(LLMService()).export_ndjson(include_embedding=not args.no_embeddings)
+    if args.output and _is_parquet(args.output):
+        count = await write_parquet(chunks, args.output)
+        print(f"Exported {count} tasks to {args.output}", file=sys.stderr)
+        return
+
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        async for chunk in chunks:
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+
+
+async def run_import_tasks(args: argparse.Namespace) -> None:
+    """Imports an NDJSON or Parquet export, parsing description-only rows with the LLM"""
+    service = TaskTransferService(LLMService())
+    if _is_parquet(args.path):
+        result = await service.import_rows(iter_rows(read_parquet_rows(args.path)), parse=args.parse)
+    else:
+        with open(args.path, "rb") as f:
+            result = await service.import_rows(iter_rows(f), parse=args.parse)
+
+    print(f"Imported {result.imported} tasks, {result.failed} failed")
+    for error in result.errors:
+        print(f"  {error}")
+    if result.imported:
+        print("Run backfill-embeddings to embed imported tasks that arrived without an embedding")
+    await close_async_openai_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TaskAgent maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    reindex = subparsers.add_parser("reindex-missing", help="Embed tasks whose embedding is pending or failed")
+    reindex.add_argument("--workers", type=int, default=None, help="Concurrent indexing jobs (asyncio mode)")
+    reindex.set_defaults(handler=run_reindex_missing)
+
+    backfill = subparsers.add_parser("backfill-embeddings", help="Re-embed tasks in batches with resumable checkpoints")
+    backfill.add_argument("--all", action="store_true", help="Re-embed every task, e.g. after changing models")
+    backfill.add_argument("--batch-size", type=int, default=256, help="Tasks per embedding batch and UPDATE")
+    backfill.add_argument("--concurrency", type=int, default=4, help="Batches processed at once")
+    backfill.add_argument("--checkpoint", default=".backfill_checkpoint.json", help="Progress file used to resume")
+    backfill.add_argument("--reindex", action="store_true", help="Rebuild the HNSW index when done")
+    backfill.set_defaults(handler=run_backfill_embeddings)
+
+    resize = subparsers.add_parser("resize-embeddings", help="Resize the embedding column for a new model")
+    resize.add_argument("--dimension", type=int, default=None, help="Defaults to Settings.EMBEDDING_DIMENSION")
+    resize.add_argument("--confirm", action="store_true", help="Required: all stored embeddings are deleted")
+    resize.set_defaults(handler=run_resize_embeddings)
+
+    export = subparsers.add_parser("export-tasks", help="Export all tasks as NDJSON or Parquet")
+    export.add_argument("--output", help="File to write (*.parquet for Parquet); NDJSON to stdout if omitted")
+    export.add_argument("--no-embeddings", action="store_true", help="Leave embeddings out of the export")
+    export.set_defaults(handler=run_export_tasks)
+
+    import_ = subparsers.add_parser("import-tasks", help="Import tasks from an NDJSON or Parquet export")
+    import_.add_argument("path", help="NDJSON file, or *.parquet")
+    import_.add_argument("--parse", action="store_true", help="Parse every row's description with the LLM")
+    import_.set_defaults(handler=run_import_tasks)
+
+    args = parser.parse_args()
+    configure_logging()
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,7 @@
 import os
 from functools import lru_cache
-from typing import Literal
+from typing import Literal, Optional
 
-import openai
 from dotenv import load_dotenv
 from pydantic.v1 import BaseSettings
 
@@ -16,9 +15,6 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise RuntimeError("❌ OPENAI_API_KEY is not set in environment variables!")
 
-# OpenAI client setup
-client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
 
 class Settings(BaseSettings):
     # Database settings
@@ -28,9 +24,80 @@ class Settings(BaseSettings):
     DB_NAME: str = "taskagent"
     DB_PORT: int = 5432
 
+    # Connection pool settings (per worker process). Pre-ping costs a round trip per
+    # checkout; recycling connections older than DB_POOL_RECYCLE bounds staleness instead.
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection before failing
+    DB_POOL_RECYCLE: int = 1800  # Seconds, -1 disables
+    DB_POOL_PRE_PING: bool = False
+    DB_ECHO: bool = False  # Log every SQL statement (through the app's log queue)
+    # asyncpg prepared statements cached per connection; 0 when behind PgBouncer in transaction mode
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # Server-side statement_timeout, 0 disables
+
     # Application settings
     ENV: Literal["development", "production", "test"] = "development"
+
+    # Logging settings
     LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True  # One JSON object per line; False for human-readable lines
+    LOG_DEBUG_SAMPLE_RATE: float = 0.01  # Share of requests whose DEBUG events are kept
+
+    # OpenAI client settings
+    OPENAI_BASE_URL: Optional[str] = None  # Point at a local stub for benchmarks
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_MAX_RETRIES: int = 2
+
+    # LLM settings
+    LLM_MODEL: str = "gpt-3.5-turbo"
+    LLM_TIMEOUT: float = 30.0  # Seconds per chat completion
+    LLM_MAX_CONCURRENCY: int = 32  # In-flight chat completions per worker
+    # Stream task parses so embedding starts as soon as the task name is complete
+    LLM_STREAM_TASK_PARSE: bool = False
+
+    # Task-parse cache settings; entries are also keyed by date so relative due
+    # dates ("Friday") are re-resolved each day
+    LLM_CACHE_SIZE: int = 5000
+    LLM_CACHE_TTL: int = 6 * 3600  # Seconds, 0 disables expiry
+    LLM_CACHE_REDIS_URL: Optional[str] = None  # e.g. redis://localhost:6379/0
+
+    # Embedding backend: "openai" calls the API; "local" runs a sentence-transformers
+    # model on this machine (pip install -r requirements-local.txt). EMBEDDING_DIMENSION
+    # must match the model (1536 for text-embedding-ada-002, 384 for all-MiniLM-L6-v2)
+    # and the tasks.embedding column; run `python -m api.cli resize-embeddings` after
+    # changing it.
+    EMBEDDING_BACKEND: Literal["openai", "local"] = "openai"
+    EMBEDDING_MODEL: str = "text-embedding-ada-002"
+    EMBEDDING_DIMENSION: int = 1536
+    LOCAL_EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    LOCAL_EMBEDDING_WORKERS: int = 2  # Processes encoding in parallel
+
+    # Embedding cache settings
+    EMBEDDING_CACHE_SIZE: int = 10000  # Entries kept in the in-process LRU
+    EMBEDDING_CACHE_TTL: int = 7 * 24 * 3600  # Seconds, 0 disables expiry
+    EMBEDDING_CACHE_REDIS_URL: Optional[str] = None  # e.g. redis://localhost:6379/0
+
+    # Embedding micro-batching: concurrent embedding requests are collected for up to
+    # the window (or until the batch is full) and sent as one API call
+    EMBEDDING_BATCH_WINDOW_MS: float = 5.0
+    EMBEDDING_BATCH_MAX_SIZE: int = 256  # Capped at the backend's limit (2048 for OpenAI)
+
+    # Vector search backend: "pgvector" searches tasks.embedding in Postgres (shared by
+    # all workers); "chroma" uses the process-local ./chroma_db store
+    VECTOR_BACKEND: Literal["pgvector", "chroma"] = "pgvector"
+
+    # Search queries the rule-based parser understands with at least this
+    # confidence skip the LLM call; 1.0 sends every query to the LLM
+    QUERY_FAST_PATH_MIN_CONFIDENCE: float = 0.8
+
+    # Background indexing (embedding + vector store) settings
+    INDEXING_MODE: Literal["inline", "asyncio", "celery"] = "asyncio"
+    INDEXING_WORKERS: int = 4  # Consumers in asyncio mode
+    INDEXING_MAX_RETRIES: int = 5
+    INDEXING_RETRY_BASE_DELAY: float = 1.0  # Seconds, doubled per retry
+    CELERY_BROKER_URL: str = "redis://localhost:6379/0"
 
     @property
     def DATABASE_URL(self) -> str:
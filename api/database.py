@@ -1,23 +1,76 @@
+import time
 from datetime import datetime
 from typing import List, AsyncGenerator
 
+from pgvector.asyncpg import register_vector
+from sqlalchemy import event, insert
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from api.config import get_settings
 from api.models.dbmodels import Task
 from api.models.schemas import TaskOutput
+from api.utils.metrics import gauge, histogram
 
 settings = get_settings()
 
+POOL_CHECKED_OUT = gauge("taskagent_db_pool_checked_out", "Connections currently checked out of the pool")
+POOL_SIZE = gauge("taskagent_db_pool_connections", "Connections currently open in the pool, including overflow")
+POOL_WAITERS = gauge("taskagent_db_pool_waiters", "Checkouts currently waiting for a connection")
+POOL_WAIT_SECONDS = histogram(
+    "taskagent_db_pool_wait_seconds",
+    "Time spent acquiring a connection from the pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how many checkouts wait and for how long"""
+
+    def _do_get(self):
+        POOL_WAITERS.inc()
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAITERS.dec()
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+
+
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=settings.ENV == "development",
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True
+    # SQL logging (DB_ECHO) is enabled on the sqlalchemy.engine logger by configure_logging
+    poolclass=InstrumentedPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    }
 )
+POOL_CHECKED_OUT.set_function(lambda: engine.pool.checkedout())
+POOL_SIZE.set_function(lambda: engine.pool.checkedout() + engine.pool.checkedin())
+
+
+async def _register_vector(connection) -> None:
+    try:
+        await register_vector(connection)
+    except ValueError as e:
+        # The pgvector extension is not installed yet (e.g. before migrations)
+        if not str(e).startswith("unknown type:"):
+            raise
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _register_vector_codec(dbapi_connection, connection_record):
+    """Use pgvector's binary wire format on every new asyncpg connection"""
+    dbapi_connection.run_async(_register_vector)
+
 
 SessionLocal = async_sessionmaker(
     autocommit=False,
@@ -31,7 +84,9 @@ async def get_db():
     async with SessionLocal() as session:
         try:
             yield session
-            await session.commit()
+            # Repository writes commit themselves; only commit work still pending
+            if session.in_transaction():
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
@@ -63,15 +118,17 @@ async def store_task(db: AsyncSession, parsed_task: dict) -> Task:
         else:
             due_date = parsed_task["due_date"]
 
-    db_task = Task(
-        name=parsed_task["name"],
-        due_date=due_date,
-        priority=parsed_task.get("priority"),
-        category=parsed_task.get("category")
+    db_task = await db.scalar(
+        insert(Task)
+        .values(
+            name=parsed_task["name"],
+            due_date=due_date,
+            priority=parsed_task.get("priority"),
+            category=parsed_task.get("category")
+        )
+        .returning(Task)
     )
-    db.add(db_task)
     await db.commit()
-    await db.refresh(db_task)
 
     return db_task
 
@@ -1,15 +1,51 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from api.routes import tasks
+from api.services.embedding_backends import close_embedding_backend
+from api.services.embedding_backfill import check_embedding_dimension
+from api.services.openai_client import close_async_openai_client
+from api.utils.log import configure_logging, start_request, stop_logging
+from api.utils.metrics import render_prometheus
 from api.utils.error_handlers import (
     openai_error_handler,
     auth_error_handler,
     rate_limit_error_handler,
     api_error_handler,
-    generic_exception_handler
+    generic_exception_handler,
+    http_exception_handler
 )
 from openai import AuthenticationError, RateLimitError, APIError, OpenAIError
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+
+configure_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await check_embedding_dimension()
+    await tasks.indexing_queue.start()
+    yield
+    await tasks.indexing_queue.stop()
+    # Release pooled connections held by the shared OpenAI client
+    await close_async_openai_client()
+    await close_embedding_backend()
+    stop_logging()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    """Tags every log record of the request with its id, echoed back in X-Request-ID"""
+    request_id = start_request(request.headers.get("X-Request-ID"))
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
 
-app = FastAPI()
 
 # Include task-related routes
 app.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
@@ -19,8 +55,15 @@ app.add_exception_handler(OpenAIError, openai_error_handler)
 app.add_exception_handler(AuthenticationError, auth_error_handler)
 app.add_exception_handler(RateLimitError, rate_limit_error_handler)
 app.add_exception_handler(APIError, api_error_handler)
+app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(Exception, generic_exception_handler)
 
 @app.get("/")
 def read_root():
     return {"message": "TaskAgent API is running!"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
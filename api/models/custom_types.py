@@ -1,4 +1,4 @@
-from typing import Any, Optional, List
+from typing import Any, Optional, List, Union
 from sqlalchemy.types import UserDefinedType
 import numpy as np
 
@@ -13,6 +13,15 @@ class Vector(UserDefinedType):
         return f"vector({self.dimension})"
 
     def bind_processor(self, dialect):
+        if dialect.driver == "asyncpg":
+            # pgvector's binary codec (registered in api.database) encodes lists and ndarrays directly
+            def process(value: Optional[Union[List[float], np.ndarray]]):
+                if value is not None and len(value) != self.dimension:
+                    raise ValueError(f"Vector must be {self.dimension} dimensions")
+                return value
+
+            return process
+
         def process(value: Optional[List[float]]) -> Optional[str]:
             if value is None:
                 return None
@@ -27,6 +36,10 @@ class Vector(UserDefinedType):
         return process
 
     def result_processor(self, dialect, coltype):
+        if dialect.driver == "asyncpg":
+            # Already decoded to an ndarray by the binary codec
+            return None
+
         def process(value):
             if value is None:
                 return None
@@ -35,4 +48,4 @@ class Vector(UserDefinedType):
                 return [float(x) for x in value[1:-1].split(',')]
             return value
 
-        return process
\ No newline at end of file
+        return process
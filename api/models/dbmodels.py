@@ -2,6 +2,8 @@
 from sqlalchemy import Column, Integer, String, Date, DateTime, func, Index, CheckConstraint
 from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import deferred
+from api.config import get_settings
 from api.models.custom_types import Vector
 
 Base = declarative_base()
@@ -19,8 +21,11 @@ class Task(Base):
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
     confidence_score = Column(Integer, nullable=False, server_default='50')
     priority_source = Column(String, nullable=False, server_default='ai')
-    embedding = Column(Vector(1536), nullable=True)
-    search_vector = Column(TSVECTOR)
+    embedding_status = Column(String, nullable=False, server_default='pending')
+    # Large columns no response needs; they are only loaded on request
+    # (see TaskRepository include_embedding) and raise instead of lazy-loading
+    embedding = deferred(Column(Vector(get_settings().EMBEDDING_DIMENSION), nullable=True), group="embedding", raiseload=True)
+    search_vector = deferred(Column(TSVECTOR), raiseload=True)
 
 
     __table_args__ = (
@@ -31,5 +36,9 @@ class Task(Base):
         CheckConstraint(
             "priority_source IN ('ai', 'regex')",
             name='tasks_priority_source_values'
+        ),
+        CheckConstraint(
+            "embedding_status IN ('pending', 'ready', 'failed')",
+            name='tasks_embedding_status_values'
         )
     )
@@ -35,6 +35,10 @@ class TaskOutput(BaseModel):
     priority_source: str = Field(
         description="Source of priority assignment ('ai' or 'regex')"
     )
+    embedding_status: Optional[str] = Field(
+        default=None,
+        description="Whether the task's embedding is 'pending', 'ready' or 'failed'"
+    )
     created_at: datetime
     updated_at: datetime
     # embedding: Optional[List[float]]
@@ -42,3 +46,28 @@ class TaskOutput(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TaskBatchInput(BaseModel):
+    descriptions: List[str] = Field(..., min_length=1, max_length=1000)
+
+
+class TaskBatchItemResult(BaseModel):
+    """Outcome for one description, at the same index as in the request"""
+    index: int
+    success: bool
+    task: Optional[TaskOutput] = None
+    error: Optional[str] = None
+
+
+class TaskBatchOutput(BaseModel):
+    created: int
+    failed: int
+    results: List[TaskBatchItemResult]
+
+
+class TaskImportOutput(BaseModel):
+    imported: int
+    failed: int
+    # First errors only, as "line N: reason"
+    errors: List[str]
@@ -1,71 +1,332 @@
-from datetime import datetime
-from typing import List, Optional, Dict, Any
-from sqlalchemy import select, update as sql_update, delete as sql_delete, func, and_, cast, literal
+import logging
+from dataclasses import dataclass
+from datetime import datetime, date
+from typing import List, Optional, Dict, Any, Awaitable, Callable, Sequence, Tuple
+from sqlalchemy.orm import undefer_group
+from sqlalchemy import select, insert, update as sql_update, delete as sql_delete, func, and_, or_, cast, Float
 
 from api.models.custom_types import Vector
 from api.models.dbmodels import Task
+from api.utils.constants import EmbeddingStatus, QUERY_FILLER_WORDS, SEARCH_KEYWORDS
+from api.utils.metrics import timed
+from api.utils.pagination import Cursor
+
+# Parsed-task fields that are stored as task columns
+TASK_FIELDS = ("name", "due_date", "priority", "category")
+
+logger = logging.getLogger(__name__)
+
+# Columns written by bulk import, in record order (id and search_vector are generated)
+COPY_COLUMNS = (
+    "name", "due_date", "priority", "category", "confidence_score", "priority_source",
+    "embedding_status", "embedding", "created_at", "updated_at"
+)
+_CREATED_AT, _UPDATED_AT = COPY_COLUMNS.index("created_at"), COPY_COLUMNS.index("updated_at")
+
+# One JSON object per task. The embedding is pgvector's binary send format, base64-encoded
+# (Postgres wraps base64 at 76 characters, so the newlines are stripped)
+EXPORT_QUERY = """
+    SELECT json_build_object(
+        'id', id, 'name', name, 'due_date', due_date, 'priority', priority, 'category', category,
+        'confidence_score', confidence_score, 'priority_source', priority_source,
+        'embedding_status', embedding_status,
+        'created_at', to_char(created_at, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+        'updated_at', to_char(updated_at, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+        'embedding', CASE WHEN $1 THEN translate(encode(vector_send(embedding), 'base64'), E'\\n', '') END
+    )
+    FROM tasks
+    ORDER BY id
+"""
+
+
+def task_row(task_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values for a parsed task, dropping parser-only fields"""
+    return {field: task_data.get(field) for field in TASK_FIELDS}
+
+
+def _coerce_due_date(task_data: Dict[str, Any]) -> None:
+    """Ensure due_date is a date object if provided"""
+    if task_data.get('due_date'):
+        if isinstance(task_data['due_date'], str):
+            try:
+                task_data['due_date'] = datetime.strptime(
+                    task_data['due_date'],
+                    "%Y-%m-%d"
+                ).date()
+            except ValueError:
+                task_data['due_date'] = None
+        elif isinstance(task_data['due_date'], datetime):
+            task_data['due_date'] = task_data['due_date'].date()
+
+
+@dataclass(frozen=True)
+class TaskFilters:
+    """
+    Structured filters applied inside search queries, so the priority/category/
+    due-date indexes prune candidates before anything is scored.
+    """
+    priority: Optional[str] = None
+    category: Optional[str] = None
+    start_date: Optional[date] = None  # Due on or after
+    end_date: Optional[date] = None  # Due on or before
+
+    def conditions(self) -> list:
+        conditions = []
+        # Exact match conditions first (fast index lookups)
+        if self.priority:
+            conditions.append(Task.priority == self.priority)
+        if self.category:
+            conditions.append(Task.category == self.category)
+        if self.start_date:
+            conditions.append(Task.due_date >= self.start_date)
+        if self.end_date:
+            conditions.append(Task.due_date <= self.end_date)
+        return conditions
+
+
+def _needs_embedding():
+    """Tasks the indexer has not embedded, plus any ready row that lost its vector"""
+    return or_(Task.embedding_status != EmbeddingStatus.READY.value, Task.embedding.is_(None))
+
+
+def _select_tasks(include_embedding: bool = False):
+    """select(Task) without the deferred embedding column unless it is asked for"""
+    query = select(Task)
+    if include_embedding:
+        query = query.options(undefer_group("embedding"))
+    return query
+
+
+def _filter_conditions(filters: Optional[TaskFilters]) -> list:
+    return filters.conditions() if filters else []
 
 
 class TaskRepository:
     def __init__(self, db):
         self.db = db
 
-    async def get_all(self) -> List[Task]:
+    async def get_all(self, include_embedding: bool = False) -> List[Task]:
         """Get all tasks"""
-        result = await self.db.execute(select(Task))
+        result = await self.db.execute(_select_tasks(include_embedding))
         return result.scalars().all()
 
-    async def get_by_id(self, task_id: int) -> Optional[Task]:
+    async def get_page(
+            self,
+            limit: int,
+            after: Optional[Cursor] = None,
+            include_embedding: bool = False
+    ) -> List[Task]:
+        """
+        Get up to `limit` tasks ordered by (due_date NULLS LAST, id), starting after
+        the keyset position `after`. Uses the due_date index instead of OFFSET scans.
+        """
+        query = (
+            _select_tasks(include_embedding)
+            .order_by(Task.due_date.asc().nulls_last(), Task.id.asc())
+            .limit(limit)
+        )
+
+        if after is not None:
+            due_date, task_id = after
+            if due_date is None:
+                # Already into the trailing NULL due dates
+                query = query.filter(Task.due_date.is_(None), Task.id > task_id)
+            else:
+                query = query.filter(or_(
+                    Task.due_date > due_date,
+                    and_(Task.due_date == due_date, Task.id > task_id),
+                    Task.due_date.is_(None)
+                ))
+
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def get_by_id(self, task_id: int, include_embedding: bool = False) -> Optional[Task]:
         """Get task by id"""
-        result = await self.db.execute(select(Task).filter(Task.id == task_id))
+        result = await self.db.execute(_select_tasks(include_embedding).filter(Task.id == task_id))
         return result.scalar_one_or_none()
 
-    async def get_tasks_by_ids(self, task_ids: List[int]) -> List[Task]:
+    @timed("hydration")
+    async def get_tasks_by_ids(
+            self,
+            task_ids: List[int],
+            include_embedding: bool = False,
+            filters: Optional[TaskFilters] = None
+    ) -> List[Task]:
         """Get tasks by a list of ids"""
-        result = await self.db.execute(select(Task).filter(Task.id.in_(task_ids)))
+        result = await self.db.execute(
+            _select_tasks(include_embedding).filter(Task.id.in_(task_ids), *_filter_conditions(filters))
+        )
         return result.scalars().all()
 
+    @timed("db_insert")
     async def create(self, task_data: Dict[str, Any]) -> Task:
-        """Create a new task with proper date handling"""
-        # Ensure due_date is a date object if provided
-        if task_data.get('due_date'):
-            if isinstance(task_data['due_date'], str):
-                try:
-                    task_data['due_date'] = datetime.strptime(
-                        task_data['due_date'],
-                        "%Y-%m-%d"
-                    ).date()
-                except ValueError:
-                    task_data['due_date'] = None
-            elif isinstance(task_data['due_date'], datetime):
-                task_data['due_date'] = task_data['due_date'].date()
-
-        db_task = Task(**task_data)
-        self.db.add(db_task)
+        """Create a new task with proper date handling, in one INSERT ... RETURNING"""
+        _coerce_due_date(task_data)
+
+        db_task = await self.db.scalar(insert(Task).values(**task_data).returning(Task))
         await self.db.commit()
-        await self.db.refresh(db_task)
         return db_task
 
+    @timed("db_insert")
+    async def create_many(self, tasks_data: List[Dict[str, Any]]) -> List[Task]:
+        """
+        Insert many tasks with one multi-row INSERT ... RETURNING in a single transaction.
+        Returns the created tasks in input order.
+        """
+        if not tasks_data:
+            return []
+        for task_data in tasks_data:
+            _coerce_due_date(task_data)
+
+        result = await self.db.scalars(
+            insert(Task).returning(Task, sort_by_parameter_order=True),
+            tasks_data
+        )
+        db_tasks = list(result.all())
+        await self.db.commit()
+        return db_tasks
+
     async def update(self, task_id: int, update_data: Dict[str, Any]) -> Optional[Task]:
         """
-        Update a task by id
+        Update a task by id with one UPDATE ... RETURNING
         Returns updated task or None if task not found
         """
-        # First check if task exists
-        task = await self.get_by_id(task_id)
-        if not task:
-            return None
+        if not update_data:
+            return await self.get_by_id(task_id)
 
-        # Update the task
-        await self.db.execute(
+        task = await self.db.scalar(
             sql_update(Task)
             .where(Task.id == task_id)
             .values(**update_data)
+            .returning(Task)
         )
         await self.db.commit()
+        return task
 
-        # Fetch and return updated task
-        return await self.get_by_id(task_id)
+    async def set_embedding(
+            self,
+            task_id: int,
+            embedding: Optional[List[float]],
+            status: EmbeddingStatus = EmbeddingStatus.READY
+    ) -> None:
+        """Store a task's embedding (or just its status, when embedding is None)"""
+        values = {"embedding_status": status.value}
+        if embedding is not None:
+            values["embedding"] = embedding
+        await self.db.execute(
+            sql_update(Task)
+            .where(Task.id == task_id)
+            .values(**values)
+        )
+        await self.db.commit()
+
+    async def get_ids_needing_embedding(self, after_id: int = 0, limit: int = 1000) -> List[int]:
+        """
+        Ids of tasks whose embedding is not ready, in id order after `after_id`.
+        Served by the idx_tasks_embedding_not_ready partial index.
+        """
+        result = await self.db.execute(
+            select(Task.id)
+            .where(Task.embedding_status != EmbeddingStatus.READY.value, Task.id > after_id)
+            .order_by(Task.id)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def get_tasks_for_embedding(
+            self,
+            after_id: int = 0,
+            limit: int = 1000,
+            only_missing: bool = True
+    ) -> List[Task]:
+        """
+        Keyset page of tasks in id order after `after_id`, for (re-)embedding.
+        With only_missing, just tasks without a usable embedding.
+        """
+        query = select(Task).where(Task.id > after_id).order_by(Task.id).limit(limit)
+        if only_missing:
+            query = query.where(_needs_embedding())
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
+    async def count_tasks_for_embedding(self, after_id: int = 0, only_missing: bool = True) -> int:
+        query = select(func.count()).select_from(Task).where(Task.id > after_id)
+        if only_missing:
+            query = query.where(_needs_embedding())
+        return await self.db.scalar(query)
+
+    async def set_embeddings(self, embeddings: Sequence[Tuple[int, Optional[List[float]]]]) -> None:
+        """
+        Stores many embeddings in one executemany UPDATE and one commit.
+        Tasks whose embedding is None are marked failed and keep their old vector.
+        """
+        ready = [
+            {"id": task_id, "embedding": embedding, "embedding_status": EmbeddingStatus.READY.value}
+            for task_id, embedding in embeddings if embedding is not None
+        ]
+        failed = [
+            {"id": task_id, "embedding_status": EmbeddingStatus.FAILED.value}
+            for task_id, embedding in embeddings if embedding is None
+        ]
+        # Bulk UPDATE by primary key: one statement, executed once per parameter set
+        for rows in (ready, failed):
+            if rows:
+                await self.db.execute(sql_update(Task), rows)
+        await self.db.commit()
+
+    async def _driver_connection(self):
+        """
+        The session's asyncpg connection, for COPY. Statements sent on it bypass
+        SQLAlchemy, which only sends BEGIN on its own first execute, so callers
+        open connection.transaction() themselves (a savepoint if the session
+        already began one).
+        """
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+        return raw_connection.driver_connection
+
+    @timed("db_insert")
+    async def copy_tasks(self, records: Sequence[Tuple[Any, ...]]) -> int:
+        """
+        Inserts rows (values in COPY_COLUMNS order) with COPY, which is far cheaper
+        per row than INSERT. The search_vector trigger still fires for each row.
+        Missing (None) timestamps get the column default's value, as with INSERT.
+        """
+        connection = await self._driver_connection()
+        async with connection.transaction():
+            # COPY lists every column, so defaults never apply; use the same clock as
+            # server_default=func.now() on the naive DateTime columns
+            now = await connection.fetchval("SELECT LOCALTIMESTAMP")
+            records = [
+                (*record[:_CREATED_AT], record[_CREATED_AT] or now, record[_UPDATED_AT] or now)
+                for record in records
+            ]
+            await connection.copy_records_to_table("tasks", records=records, columns=COPY_COLUMNS)
+        # Commits the session's own transaction if it had begun one (the COPY was then a savepoint)
+        await self.db.commit()
+        return len(records)
+
+    async def export_ndjson(self, output: Callable[[bytes], Awaitable[None]], include_embedding: bool = True) -> None:
+        """
+        Streams every task as NDJSON to `output` with COPY TO STDOUT, so Postgres
+        serializes the rows and memory stays constant regardless of table size.
+        """
+        connection = await self._driver_connection()
+        # SET LOCAL only applies inside a transaction, and the raw connection has none open
+        async with connection.transaction():
+            # A full export (or one held back by a slow client) can outlast the server-side statement_timeout
+            await connection.execute("SET LOCAL statement_timeout = 0")
+            # CSV with quote/delimiter bytes that JSON never contains unescaped emits
+            # each JSON object verbatim, one per line
+            await connection.copy_from_query(
+                EXPORT_QUERY,
+                include_embedding,
+                output=output,
+                format="csv",
+                delimiter="\x02",
+                quote="\x01"
+            )
 
     async def delete(self, task_id: int) -> bool:
         """
@@ -108,39 +369,22 @@ class TaskRepository:
                 start_date=datetime.now()
             )
         """
-        print(f"""
-            Search parameters:
-            - search_vector_query: {search_vector_query}
-            - priority: {priority}
-            - category: {category}
-            """)  # Debug log
+        logger.debug("Full-text search", extra={
+            "search_vector_query": search_vector_query, "priority": priority, "category": category
+        })
         # Start with base query
         query = select(Task)
-        conditions = []
 
         # First: Add exact match conditions (fast index lookups)
-        if priority:
-            conditions.append(Task.priority == priority)
-            print(f"Added priority condition: {priority}")
-
-        if category:
-            conditions.append(Task.category == category)
-            print(f"Added category condition: {category}")
-
-        if start_date:
-            conditions.append(Task.due_date >= start_date)
-        if end_date:
-            conditions.append(Task.due_date <= end_date)
+        conditions = TaskFilters(priority, category, start_date, end_date).conditions()
 
         # Add full-text search if provided
         if search_vector_query:
             search_terms = [
                 term for term in search_vector_query.lower().split()
-                if term not in ['priority', 'high', 'medium', 'low', 'show', 'me', 'all', 'tasks', 'finance', 'work',
-                                'personal']
+                if term not in SEARCH_KEYWORDS
             ]
             if search_terms:  # Only use search if we have other meaningful terms
-                print(f"Adding search for terms: {search_terms}")
                 ts_query = func.plainto_tsquery('english', ' '.join(search_terms))
                 conditions.append(Task.search_vector.op('@@')(ts_query))
                 query = query.order_by(
@@ -155,34 +399,75 @@ class TaskRepository:
         result = await self.db.execute(query)
         return result.scalars().all()
 
+    @timed("text_search")
+    async def rank_full_text(self, text: str, limit: int, filters: Optional[TaskFilters] = None) -> List[int]:
+        """
+        Ids of tasks matching any meaningful term of `text`, best ts_rank_cd first.
+        Filters through the search_vector GIN index and stops after `limit` rows.
+        """
+        terms = [
+            term.strip('-"') for term in text.lower().split()
+            if term not in QUERY_FILLER_WORDS
+        ]
+        terms = [term for term in terms if term]
+        if not terms:
+            return []
+
+        # websearch syntax ORs the terms and never raises on user input
+        ts_query = func.websearch_to_tsquery('english', ' or '.join(terms))
+        result = await self.db.execute(
+            select(Task.id)
+            .filter(Task.search_vector.op('@@')(ts_query), *_filter_conditions(filters))
+            .order_by(func.ts_rank_cd(Task.search_vector, ts_query).desc())
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    @timed("vector_search")
+    async def rank_by_embedding(
+            self,
+            embedding: List[float],
+            limit: int,
+            filters: Optional[TaskFilters] = None
+    ) -> List[int]:
+        """Ids of the `limit` tasks nearest to `embedding`, closest first (HNSW index)"""
+        distance_expr = Task.embedding.op('<=>', return_type=Float)(embedding)
+        result = await self.db.execute(
+            select(Task.id)
+            .filter(Task.embedding.is_not(None), *_filter_conditions(filters))
+            .order_by(distance_expr)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    @timed("vector_search")
     async def find_similar_by_embedding(
             self,
             embedding: List[float],
-            threshold: float = 0.85,
-            limit: int = 5
+            max_distance: float = 0.5,
+            limit: int = 5,
+            filters: Optional[TaskFilters] = None
     ) -> List[tuple[Task, float]]:
-        """Find similar tasks using cosine similarity"""
+        """
+        Find the tasks nearest to `embedding` by cosine distance, closest first.
+        Ordering by the raw `<=>` distance lets Postgres walk the HNSW index
+        (task_embedding_idx) and stop after `limit` rows; the threshold and the
+        task columns come back in the same query.
+        """
         try:
-            print(f"\nSearching with threshold: {threshold}")
-            print(f"Embedding type: {type(embedding)}")
-            print(f"Embedding length: {len(embedding) if embedding else 'None'}")
-
-            # Create the similarity expression once
-            similarity_expr = (literal(1.0) - Task.embedding.op('<=>')(embedding)).label('similarity')
+            distance_expr = Task.embedding.op('<=>', return_type=Float)(embedding)
 
             query = (
-                select(Task, similarity_expr)
-                .filter(Task.embedding.is_not(None))
-                .filter(similarity_expr > threshold)
-                .order_by(similarity_expr.desc())
+                select(Task, distance_expr.label('distance'))
+                .filter(Task.embedding.is_not(None), *_filter_conditions(filters))
+                .filter(distance_expr <= max_distance)
+                .order_by(distance_expr)
                 .limit(limit)
             )
 
             result = await self.db.execute(query)
             return result.all()
 
-        except Exception as e:
-            print(f"Search error: {str(e)}")
-            print(f"Error type: {type(e)}")
-            print(f"Query parameters: {embedding[:5] if embedding else None}")  # Debug first few values
+        except Exception:
+            logger.exception("Vector search failed")
             return []
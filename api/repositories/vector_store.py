@@ -1,46 +1,124 @@
+import logging
 import os
+from functools import lru_cache
+from typing import List, Optional, Dict, Any
+
 from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
 from langchain.docstore.document import Document
+from langchain_core.embeddings import Embeddings
 
 from api.config import get_settings, OPENAI_API_KEY
+from api.utils.metrics import EMBEDDING_API_CALLS, timed
 
 os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
 
+logger = logging.getLogger(__name__)
+
 # load settings
 settings = get_settings()
 
 # Set the directory for persisting Chroma's index
 persist_directory = "./chroma_db"
 
-# Initialize the embedding model using OpenAI's text-embedding-ada-002
-embedding_model = OpenAIEmbeddings(model="text-embedding-ada-002")
 
-# Create (or load) the Chroma vector store WITH the embedding function
-vector_store = Chroma(
-    persist_directory=persist_directory,
-    embedding_function=embedding_model
-)
+class CountingEmbeddings(Embeddings):
+    """Wraps an embedding function so every provider call Chroma makes is counted"""
+
+    def __init__(self, embeddings: Embeddings):
+        self.embeddings = embeddings
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        EMBEDDING_API_CALLS.inc(source="chroma")
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        EMBEDDING_API_CALLS.inc(source="chroma")
+        return self.embeddings.embed_query(text)
+
+
+@lru_cache()
+def get_vector_store() -> Chroma:
+    """
+    Create (or load) the Chroma vector store on first use, so deployments
+    using the pgvector backend never open ./chroma_db.
+    """
+    # Chroma embeds query text itself, so it must use the same model as EmbeddingService
+    if settings.EMBEDDING_BACKEND == "local":
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+
+        embedding_model = HuggingFaceEmbeddings(
+            model_name=settings.LOCAL_EMBEDDING_MODEL,
+            encode_kwargs={"normalize_embeddings": True}
+        )
+    else:
+        embedding_model = CountingEmbeddings(OpenAIEmbeddings(model=settings.EMBEDDING_MODEL))
+
+    # Create (or load) the Chroma vector store WITH the embedding function
+    return Chroma(
+        persist_directory=persist_directory,
+        embedding_function=embedding_model
+    )
 
 
-def add_document(doc: Document):
+@timed("chroma_insert")
+def add_document(doc: Document, embedding: Optional[List[float]] = None):
     """
     Adds a single document to the Chroma vector store and persists the changes.
+    If `embedding` is given it is stored as-is and the embedding function is not called.
     """
     if not doc.page_content.strip():
         raise ValueError("Document page_content is empty.")
 
     try:
-        # add the document using the embedding function
-        vector_store.add_documents([doc])
-    except Exception as e:
-        print(f"Error adding document to vector store: {e}")
+        if embedding is None:
+            # add the document using the embedding function
+            get_vector_store().add_documents([doc])
+            return
+
+        # Reuse the caller's vector; keyed by task id so re-indexing a task overwrites it
+        get_vector_store()._collection.upsert(
+            ids=[str(doc.metadata["task_id"])],
+            embeddings=[embedding],
+            metadatas=[doc.metadata],
+            documents=[doc.page_content]
+        )
+    except Exception:
+        logger.exception("Error adding document to vector store")
         raise
 
 
+@timed("chroma_insert")
+def add_documents(docs: List[Document], embeddings: List[List[float]]):
+    """
+    Adds many documents with precomputed embeddings in a single Chroma write.
+    """
+    try:
+        get_vector_store()._collection.upsert(
+            ids=[str(doc.metadata["task_id"]) for doc in docs],
+            embeddings=embeddings,
+            metadatas=[doc.metadata for doc in docs],
+            documents=[doc.page_content for doc in docs]
+        )
+    except Exception:
+        logger.exception("Error adding documents to vector store")
+        raise
+
+
+@timed("vector_search")
 def search_documents(query: str, k: int = 5):
     """
     Performs a similarity search for the given query.
     Returns a list of (Document, score) tuples.
     """
-    return vector_store.similarity_search_with_score(query, k=k)
+    return get_vector_store().similarity_search_with_score(query, k=k)
+
+
+@timed("vector_search")
+def search_documents_by_vector(embedding: List[float], k: int = 5, filter: Optional[Dict[str, Any]] = None):
+    """
+    Performs a similarity search with a precomputed query embedding, optionally
+    restricted by a Chroma metadata filter.
+    Returns a list of (Document, score) tuples, scored like search_documents.
+    """
+    return get_vector_store().similarity_search_by_vector_with_relevance_scores(embedding, k=k, filter=filter)
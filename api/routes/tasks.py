@@ -1,21 +1,33 @@
-from typing import List
+import logging
+from typing import List, Optional, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from api.database import get_db
-from api.models.schemas import TaskInput, TaskOutput, TaskUpdate
+from api.models.schemas import TaskInput, TaskOutput, TaskUpdate, TaskBatchInput, TaskBatchOutput, TaskImportOutput
 from api.services.embedding_service import EmbeddingService
+from api.services.indexing_queue import IndexingQueue
 from api.services.llm_service import LLMService
 from api.services.task_service import TaskService
+from api.services.transfer_service import TaskTransferService, iter_lines
 
 from api.utils.postprocess import process_parsed_task
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 # Instantiate services
 llm_service = LLMService()
 embedding_service = EmbeddingService()
-task_service = TaskService(llm_service=llm_service, embedding_service=embedding_service)
+indexing_queue = IndexingQueue(embedding_service)
+task_service = TaskService(
+    llm_service=llm_service,
+    embedding_service=embedding_service,
+    indexing_queue=indexing_queue
+)
+transfer_service = TaskTransferService(llm_service)
 
 
 @router.post("/", response_model=TaskOutput)
@@ -24,27 +36,70 @@ async def create_task(task: TaskInput, db: AsyncSession = Depends(get_db)):
     return await task_service.parse_and_create_task(task, db)
 
 
+@router.post("/batch", response_model=TaskBatchOutput)
+async def create_tasks_batch(batch: TaskBatchInput, db: AsyncSession = Depends(get_db)):
+    """Create many tasks at once; each result reports success or the error for its description"""
+    return await task_service.parse_and_create_tasks(batch, db)
+
+
+@router.post("/import", response_model=TaskImportOutput)
+async def import_tasks(
+        request: Request,
+        parse: bool = Query(False, description="Parse every row's description with the LLM, even structured rows")
+):
+    """
+    Bulk-import tasks from an NDJSON request body (one task per line, as produced by /export).
+    Rows with only a description are parsed by the LLM; rows without an embedding are left pending.
+    """
+    return await transfer_service.import_rows(iter_lines(request.stream()), parse=parse)
+
+
+@router.get("/export")
+async def export_tasks(
+        include_embedding: bool = Query(True, description="Include embeddings (base64 pgvector binary)")
+):
+    """Stream every task as NDJSON, suitable for POST /import"""
+    return StreamingResponse(
+        transfer_service.export_ndjson(include_embedding=include_embedding),
+        media_type="application/x-ndjson"
+    )
+
+
 @router.get("/search", response_model=List[TaskOutput])
 async def search_tasks(
         query: str = Query(..., description="Natural language search query"),
-        threshold: float = Query(0.5, ge=0, le=1.0),
+        threshold: float = Query(0.5, ge=0, le=1.0, description="Maximum distance for semantic matches"),
+        mode: Literal["semantic", "hybrid"] = Query(
+            "semantic",
+            description="'hybrid' fuses full-text and vector results with reciprocal rank fusion"
+        ),
+        text_weight: float = Query(1.0, ge=0, description="Weight of the full-text ranking (hybrid mode)"),
+        vector_weight: float = Query(1.0, ge=0, description="Weight of the vector ranking (hybrid mode)"),
+        limit: int = Query(3, ge=1, le=50),
         db: AsyncSession = Depends(get_db)
 ):
     """Search tasks with debug info"""
-    print(f"\nSearch request:")
-    print(f"Query: {query}")
-    print(f"Threshold: {threshold}")
+    logger.debug("Search request", extra={"query": query, "threshold": threshold, "mode": mode})
 
     try:
-        results = await task_service.search_tasks(
-            query=query,
-            threshold=threshold,
-            db=db
-        )
-        print(f"Found {len(results)} results")
+        if mode == "hybrid":
+            results = await task_service.hybrid_search(
+                db=db,
+                query=query,
+                text_weight=text_weight,
+                vector_weight=vector_weight,
+                max_results=limit
+            )
+        else:
+            results = await task_service.search_tasks(
+                query=query,
+                threshold=threshold,
+                max_results=limit,
+                db=db
+            )
+        logger.debug("Search returned %d results", len(results))
         return results
     except Exception as e:
-        print(f"Search error: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Search error: {str(e)}"
@@ -52,9 +107,21 @@ async def search_tasks(
 
 
 @router.get("/", response_model=List[TaskOutput])
-async def get_tasks(db: AsyncSession = Depends(get_db)):
-    """Get all tasks"""
-    return await task_service.get_all_tasks(db)
+async def get_tasks(
+        response: Response,
+        limit: int = Query(100, ge=1, le=1000),
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor header value from the previous page"),
+        db: AsyncSession = Depends(get_db)
+):
+    """Get tasks one page at a time; GET /export streams all of them"""
+    try:
+        tasks, next_cursor = await task_service.get_tasks_page(db, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return tasks
 
 
 @router.get("/{task_id}", response_model=TaskOutput)
@@ -0,0 +1,122 @@
+import asyncio
+import multiprocessing
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Optional
+
+from openai import AsyncOpenAI
+
+from api.config import get_settings
+from api.services.openai_client import get_async_openai_client
+from api.utils.metrics import EMBEDDING_API_CALLS, record_token_usage
+
+
+class EmbeddingBackend(ABC):
+    """Turns texts into vectors; EmbeddingService adds caching and batching on top"""
+
+    # Identifies the vector space; part of the embedding cache key
+    model: str
+    dimension: int
+    # Most texts accepted by a single embed() call
+    max_batch_size: int
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Returns one vector per text, in input order"""
+
+    async def close(self) -> None:
+        """Releases resources held by the backend (called on app shutdown)"""
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    """Remote embeddings from the OpenAI API"""
+
+    # OpenAI accepts at most this many inputs per embeddings request
+    max_batch_size = 2048
+
+    def __init__(self, model: str, dimension: int, client: Optional[AsyncOpenAI] = None):
+        self.model = model
+        self.dimension = dimension
+        self.client = client or get_async_openai_client()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        EMBEDDING_API_CALLS.inc(source="embedding_service")
+        response = await self.client.embeddings.create(input=texts, model=self.model)
+        record_token_usage("embedding", response.usage)
+        embeddings = [None] * len(texts)
+        for item in response.data:
+            embeddings[item.index] = item.embedding
+        return embeddings
+
+
+# Model loaded once per pool process by _load_local_model
+_local_model = None
+
+
+def _load_local_model(model_name: str) -> None:
+    global _local_model
+    # Imported here so sentence-transformers is only required for the local backend
+    from sentence_transformers import SentenceTransformer
+
+    _local_model = SentenceTransformer(model_name, device="cpu")
+
+
+def _encode_locally(texts: List[str]) -> List[List[float]]:
+    return _local_model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).tolist()
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """
+    Embeds on the local CPU with a sentence-transformers model, so embedding works
+    offline and without a network round trip. Encoding is CPU-bound, so it runs in
+    a process pool rather than on the event loop or in threads.
+    """
+
+    max_batch_size = 1024
+
+    def __init__(self, model: str, dimension: int, workers: int = 2):
+        self.model = model
+        self.dimension = dimension
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that holds an event loop and open sockets is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_load_local_model,
+                initargs=(self.model,)
+            )
+        return self._pool
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor(), _encode_locally, texts)
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+@lru_cache()
+def get_embedding_backend() -> EmbeddingBackend:
+    """Returns the process-wide embedding backend selected by Settings.EMBEDDING_BACKEND"""
+    settings = get_settings()
+    if settings.EMBEDDING_BACKEND == "local":
+        return LocalEmbeddingBackend(
+            model=settings.LOCAL_EMBEDDING_MODEL,
+            dimension=settings.EMBEDDING_DIMENSION,
+            workers=settings.LOCAL_EMBEDDING_WORKERS
+        )
+    return OpenAIEmbeddingBackend(model=settings.EMBEDDING_MODEL, dimension=settings.EMBEDDING_DIMENSION)
+
+
+async def close_embedding_backend() -> None:
+    """Shuts down the shared backend's resources (called on app shutdown)"""
+    if get_embedding_backend.cache_info().currsize:
+        await get_embedding_backend().close()
+        get_embedding_backend.cache_clear()
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, List, Optional
+
+from sqlalchemy import text
+
+from api.config import get_settings
+from api.database import SessionLocal, engine
+from api.models.dbmodels import Task
+from api.repositories.task_repository import TaskRepository
+from api.services.embedding_service import EmbeddingService
+
+
+@dataclass
+class BackfillCheckpoint:
+    """Progress of a backfill run, saved after every round so a crashed run can resume"""
+    model: str
+    only_missing: bool
+    after_id: int = 0
+    embedded: int = 0
+    failed: int = 0
+
+    @classmethod
+    def load(cls, path: str) -> Optional["BackfillCheckpoint"]:
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return cls(**json.load(f))
+
+    def save(self, path: str) -> None:
+        # Write-then-rename so a crash mid-write never leaves a truncated checkpoint
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(asdict(self), f)
+        os.replace(tmp_path, path)
+
+
+@dataclass
+class BackfillProgress:
+    done: int
+    total: int
+    elapsed: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.done / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        rate = self.rows_per_second
+        return (self.total - self.done) / rate if rate else None
+
+
+async def backfill_embeddings(
+        embedding_service: EmbeddingService,
+        checkpoint_path: str,
+        only_missing: bool = True,
+        batch_size: int = 256,
+        concurrency: int = 4,
+        on_progress: Optional[Callable[[BackfillProgress], None]] = None
+) -> BackfillCheckpoint:
+    """
+    Re-embeds tasks in id order, `concurrency` batches of `batch_size` at a time.
+
+    Each round reads the next batch_size * concurrency tasks with one keyset query,
+    embeds and writes the batches concurrently (each on its own session), then saves
+    the checkpoint. Re-running a round after a crash is harmless, so a run resumes
+    from the last saved round. The checkpoint is removed once the scan completes.
+    """
+    checkpoint = BackfillCheckpoint.load(checkpoint_path)
+    if checkpoint is None or (checkpoint.model, checkpoint.only_missing) != (embedding_service.model, only_missing):
+        checkpoint = BackfillCheckpoint(model=embedding_service.model, only_missing=only_missing)
+
+    async with SessionLocal() as db:
+        total = await TaskRepository(db).count_tasks_for_embedding(checkpoint.after_id, only_missing)
+
+    async def run_batch(tasks: List[Task]) -> int:
+        async with SessionLocal() as db:
+            return await embedding_service.reindex_tasks(db, tasks)
+
+    done, started = 0, time.perf_counter()
+    while True:
+        async with SessionLocal() as db:
+            tasks = await TaskRepository(db).get_tasks_for_embedding(
+                after_id=checkpoint.after_id,
+                limit=batch_size * concurrency,
+                only_missing=only_missing
+            )
+        if not tasks:
+            break
+
+        batches = [tasks[start:start + batch_size] for start in range(0, len(tasks), batch_size)]
+        embedded = sum(await asyncio.gather(*(run_batch(batch) for batch in batches)))
+
+        checkpoint.after_id = tasks[-1].id
+        checkpoint.embedded += embedded
+        checkpoint.failed += len(tasks) - embedded
+        checkpoint.save(checkpoint_path)
+
+        done += len(tasks)
+        if on_progress:
+            on_progress(BackfillProgress(done=done, total=max(total, done), elapsed=time.perf_counter() - started))
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return checkpoint
+
+
+async def rebuild_embedding_index() -> None:
+    """
+    Rebuilds the HNSW index after a full re-embed, which leaves it full of dead
+    entries. CONCURRENTLY keeps the table writable; it cannot run in a transaction.
+    """
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        # Rebuilding a large index takes far longer than the request statement_timeout
+        await conn.execute(text("SET statement_timeout = 0"))
+        try:
+            await conn.execute(text("REINDEX INDEX CONCURRENTLY task_embedding_idx"))
+        finally:
+            # Back to the connection default before it returns to the pool
+            await conn.execute(text("RESET statement_timeout"))
+
+
+async def embedding_column_dimension() -> Optional[int]:
+    """Dimension of tasks.embedding in the database; None if the table does not exist yet"""
+    async with engine.connect() as conn:
+        # pgvector stores the dimension as the column's type modifier
+        return await conn.scalar(text(
+            "SELECT atttypmod FROM pg_attribute "
+            "WHERE attrelid = to_regclass('tasks') AND attname = 'embedding' AND NOT attisdropped"
+        ))
+
+
+async def check_embedding_dimension() -> None:
+    """Fails startup when tasks.embedding does not match Settings.EMBEDDING_DIMENSION"""
+    expected = get_settings().EMBEDDING_DIMENSION
+    actual = await embedding_column_dimension()
+    if actual is not None and actual > 0 and actual != expected:
+        raise RuntimeError(
+            f"tasks.embedding is vector({actual}) but EMBEDDING_DIMENSION is {expected}; "
+            f"run `python -m api.cli resize-embeddings --confirm` to resize the column"
+        )
+
+
+async def resize_embedding_column(dimension: int) -> None:
+    """
+    Changes tasks.embedding to vector(dimension). Vectors from different models are
+    not comparable, so every stored embedding is cleared and its task marked pending;
+    run backfill-embeddings afterwards. The HNSW index is rebuilt for the new type.
+    """
+    async with engine.begin() as conn:
+        # Rewrites the whole table
+        await conn.execute(text("SET LOCAL statement_timeout = 0"))
+        await conn.execute(text("DROP INDEX IF EXISTS task_embedding_idx"))
+        await conn.execute(text(f"ALTER TABLE tasks ALTER COLUMN embedding TYPE vector({int(dimension)}) USING NULL"))
+        await conn.execute(text("UPDATE tasks SET embedding_status = 'pending'"))
+        await conn.execute(text("CREATE INDEX task_embedding_idx ON tasks USING hnsw (embedding vector_cosine_ops)"))
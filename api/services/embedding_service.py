@@ -1,101 +1,290 @@
 from __future__ import annotations
 
 import asyncio
-from typing import List, Dict, Any
+import hashlib
+import logging
+from typing import List, Dict, Any, Optional, Tuple
 
+import numpy as np
 from fastapi import HTTPException
 from langchain_core.documents import Document
-from openai import OpenAI
 from sqlalchemy import select, func, update
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.config import get_settings
 from api.models.dbmodels import Task
-from api.repositories.vector_store import add_document
+from api.repositories.task_repository import TaskRepository, task_row
+from api.repositories.vector_store import add_document, add_documents
+from api.services.embedding_backends import EmbeddingBackend, get_embedding_backend
+from api.utils.cache import TieredCache
+from api.utils.constants import EmbeddingStatus
+from api.utils.metrics import EMBEDDING_BATCH_SIZE, timed
+
+logger = logging.getLogger(__name__)
+
+
+def _status_for(embedding: List[float] | None) -> str:
+    """Tasks saved without an embedding are left pending for the reindexer"""
+    return (EmbeddingStatus.READY if embedding is not None else EmbeddingStatus.PENDING).value
 
 
 class EmbeddingService:
-    def __init__(self, model: str = "text-embedding-ada-002", vector_dimension: int = 1536):
-        self.client = OpenAI()
-        self.model = model
-        self.vector_dimension = vector_dimension
+    def __init__(self, backend: Optional[EmbeddingBackend] = None):
+        # OpenAI or a local model, per Settings.EMBEDDING_BACKEND
+        self.backend = backend or get_embedding_backend()
+        self.model = self.backend.model
+        self.vector_dimension = self.backend.dimension
+
+        settings = get_settings()
+        # With the pgvector backend the embedding column is the index; Chroma is not written
+        self.index_in_chroma = settings.VECTOR_BACKEND == "chroma"
+        self.cache = TieredCache(
+            "embeddings",
+            max_size=settings.EMBEDDING_CACHE_SIZE,
+            ttl=settings.EMBEDDING_CACHE_TTL,
+            redis_url=settings.EMBEDDING_CACHE_REDIS_URL,
+            # Vectors are cached as float32 arrays (~6KB each) and packed raw in Redis
+            encode=lambda vector: vector.tobytes(),
+            decode=lambda raw: np.frombuffer(raw, dtype=np.float32)
+        )
+
+        # Micro-batching state: texts waiting for the next embeddings request
+        self.batch_window = settings.EMBEDDING_BATCH_WINDOW_MS / 1000
+        self.batch_max_size = min(settings.EMBEDDING_BATCH_MAX_SIZE, self.backend.max_batch_size)
+        self._batch: List[Tuple[str, asyncio.Future]] = []
+        self._batch_timer: Optional[asyncio.TimerHandle] = None
+        # Strong references to in-flight requests so they are not garbage collected
+        self._batch_requests: set = set()
 
     async def generate_embedding(self, text: str) -> List[float] | None:
-        try:
-            print(f"Generating embedding for text: {text}")
-            response = await asyncio.to_thread(
-                self.client.embeddings.create,
-                input=self._prepare_text(text),
-                model=self.model
-            )
-            embedding = response.data[0].embedding
-            print(f"[DEBUG] Raw embedding length: {len(embedding)}")
+        embeddings = await self.generate_embeddings([text])
+        return embeddings[0]
 
-            # Ensure proper format and dimension
-            if len(embedding) != self.vector_dimension:
-                raise ValueError(f"Expected {self.vector_dimension} dimensions, got {len(embedding)}")
+    @timed("embedding")
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float] | None]:
+        """
+        Embeds a list of texts. Cache misses go through the micro-batching dispatcher,
+        so they share embeddings requests with concurrent callers.
+        Returns one vector per input, or None where embedding failed.
+        """
+        embeddings: List[List[float] | None] = [None] * len(texts)
+
+        # Group cache misses by normalized text so duplicates are embedded once
+        pending: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            prepared_text = self._prepare_text(text)
+            if not prepared_text:
+                continue
+            cached = await self.cache.get(self._cache_key(prepared_text))
+            if cached is not None:
+                embeddings[i] = cached.tolist()
+            else:
+                pending.setdefault(prepared_text, []).append(i)
+
+        inputs = list(pending)
+        results = await asyncio.gather(*(self._submit(text) for text in inputs), return_exceptions=True)
+        for prepared_text, result in zip(inputs, results):
+            if isinstance(result, Exception):
+                logger.warning("Failed to generate embedding: %s", result)
+                continue
+            # Rounded to float32 like a cache hit, so a text's vector never depends on cache state
+            vector = np.asarray(result, dtype=np.float32)
+            await self.cache.set(self._cache_key(prepared_text), vector)
+            for i in pending[prepared_text]:
+                embeddings[i] = vector.tolist()
+
+        return embeddings
+
+    def _submit(self, prepared_text: str) -> asyncio.Future:
+        """Queues a text for the next embeddings request; the future resolves to its vector"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._batch.append((prepared_text, future))
 
-            print(f"Generated embedding with {len(embedding)} dimensions")
-            return embedding
+        if len(self._batch) >= self.batch_max_size:
+            self._flush_batch()
+        elif self._batch_timer is None:
+            self._batch_timer = loop.call_later(self.batch_window, self._flush_batch)
+        return future
 
+    def _flush_batch(self) -> None:
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        batch, self._batch = self._batch, []
+        if batch:
+            request = asyncio.get_running_loop().create_task(self._send_batch(batch))
+            self._batch_requests.add(request)
+            request.add_done_callback(self._batch_requests.discard)
+
+    async def _send_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Sends one backend call for the batch and resolves each caller's future"""
+        # Concurrent callers may submit the same text; send it once
+        inputs = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            logger.debug("Embedding batch of %d texts", len(inputs))
+            EMBEDDING_BATCH_SIZE.observe(len(inputs))
+            vectors = dict(zip(inputs, await self.backend.embed(inputs)))
         except Exception as e:
-            print(f"[Embedding Error] Failed to generate embedding: {str(e)}")
-            return None
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for text, future in batch:
+            if future.done():
+                continue
+            embedding = vectors.get(text)
+            # Ensure proper format and dimension
+            if embedding is None:
+                future.set_exception(ValueError("No embedding returned for input"))
+            elif len(embedding) != self.vector_dimension:
+                future.set_exception(
+                    ValueError(f"Expected {self.vector_dimension} dimensions, got {len(embedding)}")
+                )
+            else:
+                future.set_result(embedding)
+
+    async def generate_task_embedding(self, task_data: Dict[str, Any]) -> List[float] | None:
+        """Embeds a parsed task the way save_task does (before it is inserted)"""
+        return await self.generate_embedding(self._task_text(task_data["name"], task_data))
 
     async def save_task(
             self,
             db: AsyncSession,
             task_data: Dict[str, Any],
+            embedding: List[float] | None = None
     ) -> Task:
+        """Embeds and inserts a task; pass `embedding` if it was already generated"""
         try:
-            embedding_text = f"{task_data['name']} {task_data.get('description', '')}"
-            print(f"[DEBUG] Generating embedding for task: {embedding_text}")
-
-            # Generate embedding using OpenAI API
-            embedding = await self.generate_embedding(embedding_text)
-            print(f"[DEBUG] Generated embedding: {True if embedding else False}")
+            if embedding is None:
+                embedding = await self.generate_task_embedding(task_data)
 
             # Create the task in the database
-            db_task = Task(
-                name=task_data["name"],
-                due_date=task_data.get("due_date"),
-                priority=task_data.get("priority"),
-                category=task_data.get("category"),
-                embedding=embedding
-            )
-
-            db.add(db_task)
-            await db.commit()
-            await db.refresh(db_task)
+            db_task = await TaskRepository(db).create({
+                **task_row(task_data),
+                "embedding": embedding,
+                "embedding_status": _status_for(embedding)
+            })
 
             # Index the task in Chroma (via LangChain)
-            try:
-                doc_text = f"{db_task.name} {task_data.get('description', '')}"
-                doc = Document(
-                    page_content=doc_text,
-                    metadata={
-                        "task_id": db_task.id,
-                        "priority": db_task.priority,
-                        "category": db_task.category,
-                        "created_at": db_task.created_at.isoformat()
-                    }
-                )
-                add_document(doc)
-            except Exception as chroma_error:
-                print(f"[WARNING] Failed to index task in Chroma: {chroma_error}")
+            if self.index_in_chroma:
+                try:
+                    # Reuse the pgvector embedding instead of letting Chroma embed the text again
+                    add_document(self._task_document(db_task, task_data), embedding=embedding)
+                except Exception as chroma_error:
+                    logger.warning("Failed to index task in Chroma: %s", chroma_error)
 
             return db_task
 
-        except Exception as e:
-            print(f"[ERROR] Failed to save task: {str(e)}")
+        except Exception:
+            logger.exception("Failed to save task")
             await db.rollback()
             raise
 
+    async def save_tasks(
+            self,
+            db: AsyncSession,
+            tasks_data: List[Dict[str, Any]],
+    ) -> List[Task]:
+        """
+        Batch version of save_task: one embeddings request for all tasks,
+        one multi-row INSERT in a single transaction and one Chroma write.
+        """
+        try:
+            embeddings = await self.generate_embeddings(
+                [self._task_text(task_data["name"], task_data) for task_data in tasks_data]
+            )
+
+            repository = TaskRepository(db)
+            db_tasks = await repository.create_many([
+                {**task_row(task_data), "embedding": embedding, "embedding_status": _status_for(embedding)}
+                for task_data, embedding in zip(tasks_data, embeddings)
+            ])
+
+            # Index the tasks in Chroma; tasks whose embedding failed are left for reindexing
+            if self.index_in_chroma:
+                try:
+                    indexed = [
+                        (self._task_document(db_task, task_data), embedding)
+                        for db_task, task_data, embedding in zip(db_tasks, tasks_data, embeddings)
+                        if embedding is not None
+                    ]
+                    if indexed:
+                        add_documents([doc for doc, _ in indexed], [embedding for _, embedding in indexed])
+                except Exception as chroma_error:
+                    logger.warning("Failed to index tasks in Chroma: %s", chroma_error)
+
+            return db_tasks
+
+        except Exception:
+            logger.exception("Failed to save tasks")
+            await db.rollback()
+            raise
+
+    async def index_task(self, db: AsyncSession, task_id: int) -> None:
+        """
+        Embeds an already committed task, stores the vector and adds it to Chroma.
+        Raises if the embedding or the index write fails, so the caller can retry.
+        """
+        repository = TaskRepository(db)
+        db_task = await repository.get_by_id(task_id)
+        if db_task is None:
+            # Deleted before it was indexed
+            return
+
+        embedding = await self.generate_embedding(self._task_text(db_task.name, {}))
+        if embedding is None:
+            raise RuntimeError(f"Failed to generate embedding for task {task_id}")
+
+        await repository.set_embedding(task_id, embedding)
+        if self.index_in_chroma:
+            # Chroma's client is synchronous; keep it off the event loop
+            await asyncio.to_thread(add_document, self._task_document(db_task, {}), embedding=embedding)
+
+    async def reindex_tasks(self, db: AsyncSession, tasks: List[Task]) -> int:
+        """
+        Re-embeds a batch of stored tasks: one backend batch, one executemany UPDATE
+        and one Chroma write. Returns how many tasks were embedded; the rest are marked failed.
+        """
+        embeddings = await self.generate_embeddings([self._task_text(task.name, {}) for task in tasks])
+        await TaskRepository(db).set_embeddings([(task.id, embedding) for task, embedding in zip(tasks, embeddings)])
+
+        indexed = [(task, embedding) for task, embedding in zip(tasks, embeddings) if embedding is not None]
+        if self.index_in_chroma and indexed:
+            await asyncio.to_thread(
+                add_documents,
+                [self._task_document(task, {}) for task, _ in indexed],
+                [embedding for _, embedding in indexed]
+            )
+        return len(indexed)
+
+    def _task_text(self, name: str, task_data: Dict[str, Any]) -> str:
+        """Text that is embedded and indexed for a task"""
+        return f"{name} {task_data.get('description', '')}"
+
+    def _task_document(self, db_task: Task, task_data: Dict[str, Any]) -> Document:
+        return Document(
+            page_content=self._task_text(db_task.name, task_data),
+            metadata={
+                "task_id": db_task.id,
+                "priority": db_task.priority,
+                "category": db_task.category,
+                "created_at": db_task.created_at.isoformat()
+            }
+        )
+
     def _prepare_text(self, text: str) -> str:
         """Prepare text for embedding generation"""
-        cleaned_text = text.strip().lower()
+        # Collapsing whitespace lets near-identical texts share one cache entry
+        cleaned_text = " ".join(text.split()).lower()
         return cleaned_text[:8000]
 
+    def _cache_key(self, prepared_text: str) -> str:
+        """Content address of an embedding: same model + same normalized text -> same vector"""
+        return hashlib.sha256(f"{self.model}\0{prepared_text}".encode()).hexdigest()
+
     async def _find_similar_by_embedding(
             self,
             db: AsyncSession,
@@ -103,8 +292,6 @@ class EmbeddingService:
             threshold: float = 0.85,
             limit: int = 5
     ) -> List[Task]:
-        print(f"Query Embedding: {query_embedding[:10] if query_embedding else 'None'}")
-
         # Rest of the method remains the same
         if query_embedding is None:
             # Fallback if no embedding generated
@@ -132,7 +319,7 @@ class EmbeddingService:
             return similar_tasks
 
         except Exception as e:
-            print(f"[Warning] Cosine similarity failed: {str(e)}")
+            logger.warning("Cosine similarity failed: %s", e)
             query = select(Task).order_by(Task.created_at.desc()).limit(limit)
             result = await db.execute(query)
             return list(result.scalars().all())
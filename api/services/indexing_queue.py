@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import random
+from typing import List, Optional
+
+from api.config import get_settings
+from api.database import SessionLocal
+from api.repositories.task_repository import TaskRepository
+from api.services.embedding_service import EmbeddingService
+from api.utils.constants import EmbeddingStatus
+
+logger = logging.getLogger(__name__)
+
+
+class IndexingQueue:
+    """
+    Runs embedding + vector-index work for newly created tasks off the request path.
+
+    Modes (Settings.INDEXING_MODE):
+    - inline:  enqueue() indexes the task before returning (previous behaviour)
+    - asyncio: an in-process queue drained by INDEXING_WORKERS consumer tasks (single node)
+    - celery:  enqueue() hands the task id to the Celery worker in api/worker.py
+
+    Failed jobs are retried with exponential backoff; after INDEXING_MAX_RETRIES
+    the task is marked 'failed' and left for the reindex-missing command.
+    """
+
+    def __init__(
+            self,
+            embedding_service: EmbeddingService,
+            mode: Optional[str] = None,
+            workers: Optional[int] = None
+    ):
+        settings = get_settings()
+        self.embedding_service = embedding_service
+        self.mode = mode or settings.INDEXING_MODE
+        self.workers = workers or settings.INDEXING_WORKERS
+        self.max_retries = settings.INDEXING_MAX_RETRIES
+        self.retry_base_delay = settings.INDEXING_RETRY_BASE_DELAY
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumers: List[asyncio.Task] = []
+
+    @property
+    def inline(self) -> bool:
+        return self.mode == "inline"
+
+    async def start(self) -> None:
+        if self.mode != "asyncio" or self._consumers:
+            return
+        self._queue = asyncio.Queue()
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """Waits briefly for queued jobs, then cancels the consumers"""
+        if not self._consumers:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Indexing queue stopped with %d jobs pending; "
+                           "run the reindex-missing command to finish them", self._queue.qsize())
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+
+    async def enqueue(self, task_id: int) -> None:
+        if self.mode == "asyncio":
+            await self.start()
+            self._queue.put_nowait(task_id)
+        elif self.mode == "celery":
+            from api.worker import index_task
+            index_task.delay(task_id)
+        else:
+            await self.index_with_retry(task_id)
+
+    async def join(self) -> None:
+        """Waits until every queued job has finished (asyncio mode)"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def _consume(self) -> None:
+        while True:
+            task_id = await self._queue.get()
+            try:
+                await self.index_with_retry(task_id)
+            except Exception:
+                # e.g. mark_failed could not reach the database; keep the consumer alive
+                logger.exception("Indexing job for task %s failed", task_id)
+            finally:
+                self._queue.task_done()
+
+    async def index_with_retry(self, task_id: int) -> bool:
+        """Indexes a task, retrying with exponential backoff. Returns False if it gave up."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.index_once(task_id)
+                return True
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error("Giving up indexing task %s after %d attempts: %s", task_id, attempt + 1, e)
+                    await self.mark_failed(task_id)
+                    return False
+                delay = retry_delay(self.retry_base_delay, attempt)
+                logger.warning("Indexing task %s failed (%s); retrying in %.1fs", task_id, e, delay)
+                await asyncio.sleep(delay)
+
+    async def index_once(self, task_id: int) -> None:
+        async with SessionLocal() as db:
+            await self.embedding_service.index_task(db, task_id)
+
+    async def mark_failed(self, task_id: int) -> None:
+        async with SessionLocal() as db:
+            await TaskRepository(db).set_embedding(task_id, None, status=EmbeddingStatus.FAILED)
+
+
+def retry_delay(base_delay: float, attempt: int) -> float:
+    """Exponential backoff with jitter: base * 2^attempt, +/- 25%"""
+    return base_delay * (2 ** attempt) * random.uniform(0.75, 1.25)
+
+
+async def reindex_missing(queue: IndexingQueue, batch_size: int = 1000) -> int:
+    """
+    Enqueues every task whose embedding is pending or failed.
+    Returns the number of tasks enqueued.
+    """
+    count, after_id = 0, 0
+    while True:
+        async with SessionLocal() as db:
+            task_ids = await TaskRepository(db).get_ids_needing_embedding(after_id=after_id, limit=batch_size)
+        if not task_ids:
+            return count
+        for task_id in task_ids:
+            await queue.enqueue(task_id)
+        count += len(task_ids)
+        after_id = task_ids[-1]
@@ -1,41 +1,103 @@
+import asyncio
+import hashlib
 import json
-from typing import Dict, Any
+import logging
+from datetime import date
+from typing import Dict, Any, Callable, List, Optional
 
 from fastapi import HTTPException
-from openai import OpenAI
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletion
+
+from api.config import get_settings
+from api.services.openai_client import get_async_openai_client
+from api.utils.cache import TieredCache
+from api.utils.metrics import LLM_STREAM_FALLBACKS, record_token_usage, time_stage
+from api.utils.partial_json import PartialJSONObject
+from api.utils.postprocess import validate_parsed_task
+
+# Bump whenever the task-parsing prompt changes, so cached parses from the old prompt are ignored
+TASK_PROMPT_VERSION = 1
+
+logger = logging.getLogger(__name__)
 
 
 class LLMService:
-    def __init__(self):
-        self.client = OpenAI()
+    def __init__(
+            self,
+            client: Optional[AsyncOpenAI] = None,
+            model: Optional[str] = None,
+            timeout: Optional[float] = None,
+            max_concurrency: Optional[int] = None
+    ):
+        settings = get_settings()
+        self.client = client or get_async_openai_client()
+        self.model = model or settings.LLM_MODEL
+        self.timeout = timeout or settings.LLM_TIMEOUT
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        # Created lazily so it binds to the running event loop, not the import-time one
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.parse_cache = TieredCache(
+            "task_parses",
+            max_size=settings.LLM_CACHE_SIZE,
+            ttl=settings.LLM_CACHE_TTL,
+            redis_url=settings.LLM_CACHE_REDIS_URL,
+            encode=lambda response: response.model_dump_json().encode(),
+            decode=ChatCompletion.model_validate_json
+        )
+
+    def _concurrency_limit(self) -> asyncio.Semaphore:
+        """Bounds in-flight completions so bursts queue here instead of at OpenAI"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
 
-    def parse_search_query(self, query: str) -> Dict[str, Any]:
+    async def _complete(self, operation: str, **kwargs) -> ChatCompletion:
+        # Latency includes waiting for a concurrency slot, as the request experiences it
+        with time_stage(f"llm_{operation}"):
+            async with self._concurrency_limit():
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    timeout=self.timeout,
+                    **kwargs
+                )
+        record_token_usage(operation, response.usage)
+        return response
+
+    async def parse_search_query(self, query: str) -> Dict[str, Any]:
         """Use OpenAI to parse natural language query into search parameters"""
-        response = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            max_tokens=100,
+        response = await self._complete(
+            "parse_query",
+            max_tokens=150,
             messages=[
-                {"role": "system", "content": """
+                {"role": "system", "content": f"""
                             Extract search parameters from natural language queries about tasks.
+                            Today is {date.today().isoformat()} ({date.today().strftime("%A")}).
                             Return a JSON object with these fields:
                             - search_terms: key words for searching (remove words like "show", "me", "all", "tasks")
                             - priority: "High"/"Medium"/"Low" if mentioned
                             - category: "Work"/"Personal"/"Finance" if mentioned
+                            - due_after: earliest due date (YYYY-MM-DD) if the query limits due dates, else null
+                            - due_before: latest due date (YYYY-MM-DD) if the query limits due dates, else null
 
                             Examples:
                             "show me all high priority tasks"
-                            {
+                            {{
                                 "search_terms": "high priority",
                                 "priority": "High",
-                                "category": null
-                            }
+                                "category": null,
+                                "due_after": null,
+                                "due_before": null
+                            }}
 
-                            "find tax documents in finance category"
-                            {
+                            "find tax documents in finance category due this week"
+                            {{
                                 "search_terms": "tax documents",
                                 "priority": null,
-                                "category": "Finance"
-                            }
+                                "category": "Finance",
+                                "due_after": "<this week's Monday>",
+                                "due_before": "<this week's Sunday>"
+                            }}
                             """
                  },
                 {"role": "user", "content": query}
@@ -43,25 +105,133 @@ class LLMService:
             response_format={"type": "json_object"}
         )
 
-        # Log token usage
-        tokens_used = response.usage.total_tokens
-        print(f"Tokens used: {tokens_used}")
         result = json.loads(response.choices[0].message.content)
-        print(f"LLM parsed result: {result}")  # Debug log
+        logger.debug("Parsed search query", extra={"parsed": result})
         return result
 
-    def parse_task_description(self, description: str):
+    async def parse_task_description(self, description: str) -> ChatCompletion:
         """
         Parses a task description using OpenAI and assigns a category and due-date automatically.
+        Identical descriptions share a cached (or in-flight) completion; completions
+        that fail validation are not cached, so a retry asks OpenAI again.
+        """
+        return await self.parse_cache.get_or_load(
+            self._parse_cache_key(description),
+            lambda: self._parse_task_description(description),
+            cacheable=_is_valid_task_parse
+        )
+
+    async def stream_task_description(
+            self,
+            description: str,
+            on_field: Callable[[str, Any], None]
+    ) -> ChatCompletion:
         """
+        Streaming variant of parse_task_description: calls on_field(field, value) for each
+        field of the JSON answer as soon as its value is complete, so dependent work can
+        start before the completion ends. Returns the assembled completion, cached like a
+        non-streamed one if it validates (cache hits return without callbacks).
+
+        Malformed JSON only stops the callbacks; the returned completion carries the raw
+        text, so process_parsed_task handles it as it would without streaming. If the
+        stream itself fails, the non-streaming request is made instead.
+        """
+        key = self._parse_cache_key(description)
+        cached = await self.parse_cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                max_tokens=100,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are a task management assistant that analyzes tasks and provides structured data.
+            response = await self._stream(
+                "parse_task", on_field, max_tokens=100, messages=_task_messages(description)
+            )
+        except Exception as e:
+            LLM_STREAM_FALLBACKS.inc(reason="stream_error")
+            logger.warning("Streaming task parse failed, retrying without streaming: %s", e)
+            return await self.parse_task_description(description)
+
+        if _is_valid_task_parse(response):
+            await self.parse_cache.set(key, response)
+        return response
+
+    async def _stream(self, operation: str, on_field: Callable[[str, Any], None], **kwargs) -> ChatCompletion:
+        """Like _complete, but streams the answer through an incremental JSON parser"""
+        parser: Optional[PartialJSONObject] = PartialJSONObject()
+        content, usage, finish_reason, chunk = [], None, None, None
+
+        with time_stage(f"llm_{operation}"):
+            async with self._concurrency_limit():
+                stream = await self.client.chat.completions.create(
+                    model=self.model,
+                    timeout=self.timeout,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **kwargs
+                )
+                async for chunk in stream:
+                    usage = chunk.usage or usage
+                    if not chunk.choices:
+                        continue
+                    finish_reason = chunk.choices[0].finish_reason or finish_reason
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    content.append(delta)
+                    if parser is None:
+                        continue
+                    try:
+                        fields = parser.feed(delta)
+                    except ValueError as e:
+                        LLM_STREAM_FALLBACKS.inc(reason="malformed_json")
+                        logger.debug("Streamed %s is not a JSON object, waiting for the full answer: %s", operation, e)
+                        parser = None
+                        continue
+                    for field, value in fields:
+                        on_field(field, value)
+
+        record_token_usage(operation, usage)
+        if chunk is None:
+            raise ValueError("Empty completion stream")
+        return ChatCompletion.model_validate({
+            "id": chunk.id,
+            "object": "chat.completion",
+            "created": chunk.created,
+            "model": chunk.model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(content)},
+                "finish_reason": finish_reason or "stop"
+            }],
+            "usage": usage.model_dump() if usage else None
+        })
+
+    def _parse_cache_key(self, description: str) -> str:
+        normalized = " ".join(description.split())
+        key = f"{TASK_PROMPT_VERSION}\0{self.model}\0{date.today().isoformat()}\0{normalized}"
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    async def _parse_task_description(self, description: str) -> ChatCompletion:
+        try:
+            return await self._complete("parse_task", max_tokens=100, messages=_task_messages(description))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+
+def _is_valid_task_parse(response: ChatCompletion) -> bool:
+    """Whether process_parsed_task would accept the completion; only those are cached"""
+    try:
+        validate_parsed_task(response)
+    except (HTTPException, TypeError):
+        return False
+    return True
+
+
+def _task_messages(description: str) -> List[Dict[str, str]]:
+    """Prompt for parse_task_description; bump TASK_PROMPT_VERSION when changing it"""
+    return [
+        {
+            "role": "system",
+            "content": """You are a task management assistant that analyzes tasks and provides structured data.
                         You must always return a confidence_score (0-100) indicating your certainty in the analysis.
                         
                         Confidence Score Guidelines:
@@ -70,10 +240,10 @@ class LLMService:
                         - 50-69:  Basic task with implicit indicators
                         - 0-49:   Ambiguous task with minimal context
                         """
-                    },
-                    {
-                        "role": "user",
-                        "content": f"""
+        },
+        {
+            "role": "user",
+            "content": f"""
                 Extract structured data from this task description. Return a JSON object with:
 
                 - name: Short, clear task name
@@ -100,15 +270,5 @@ class LLMService:
 
                 Task Description: {description}
                 """
-                    }
-                ]
-
-            )
-
-            # Log token usage
-            tokens_used = response.usage.total_tokens
-            print(f"Tokens used: {tokens_used}")
-            return response
-
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+        }
+    ]
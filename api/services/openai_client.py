@@ -0,0 +1,35 @@
+from functools import lru_cache
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from api.config import get_settings
+
+
+@lru_cache()
+def get_async_openai_client() -> AsyncOpenAI:
+    """
+    Returns the process-wide async OpenAI client.
+    All services share one httpx connection pool so keep-alive connections
+    are reused across requests instead of being opened per call.
+    """
+    settings = get_settings()
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS
+        ),
+        timeout=httpx.Timeout(settings.LLM_TIMEOUT, connect=5.0)
+    )
+    return AsyncOpenAI(
+        base_url=settings.OPENAI_BASE_URL,
+        max_retries=settings.OPENAI_MAX_RETRIES,
+        http_client=http_client
+    )
+
+
+async def close_async_openai_client() -> None:
+    """Closes the shared client's connection pool (called on app shutdown)"""
+    if get_async_openai_client.cache_info().currsize:
+        await get_async_openai_client().close()
+        get_async_openai_client.cache_clear()
@@ -1,39 +1,166 @@
-from typing import List, Optional, Dict, Any
+import asyncio
+import logging
+from typing import List, Optional, Dict, Any, Tuple
 
-from sqlalchemy import select
+from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.models.dbmodels import Task
-from api.models.schemas import TaskOutput, TaskInput
-from api.repositories.task_repository import TaskRepository
-from api.repositories.vector_store import search_documents
+from api.config import get_settings
+from api.database import SessionLocal
+from api.models.schemas import TaskOutput, TaskInput, TaskBatchInput, TaskBatchOutput, TaskBatchItemResult
+from api.repositories.task_repository import TaskRepository, TaskFilters, task_row
+from api.repositories.vector_store import search_documents, search_documents_by_vector
 from api.services.embedding_service import EmbeddingService
+from api.services.indexing_queue import IndexingQueue
 from api.services.llm_service import LLMService
-from api.utils.postprocess import process_parsed_task
+from api.utils.metrics import SEARCH_QUERY_PARSES
+from api.utils.pagination import encode_cursor, decode_cursor
+from api.utils.postprocess import infer_priority, process_parsed_task, process_search_query
+from api.utils.query_parser import parse_search_query_locally
+from api.utils.ranking import reciprocal_rank_fusion, DEFAULT_RRF_K
+
+# Candidates fetched per hybrid-search leg, relative to the number of results returned
+HYBRID_CANDIDATE_FACTOR = 5
+HYBRID_MIN_CANDIDATES = 20
+
+logger = logging.getLogger(__name__)
 
 
 class TaskService:
-    def __init__(self, llm_service: LLMService, embedding_service: EmbeddingService):
+    def __init__(
+            self,
+            llm_service: LLMService,
+            embedding_service: EmbeddingService,
+            indexing_queue: Optional[IndexingQueue] = None
+    ):
         self.llm_service = llm_service
         self.embedding_service = embedding_service
+        self.indexing_queue = indexing_queue or IndexingQueue(embedding_service, mode="inline")
+        settings = get_settings()
+        self.vector_backend = settings.VECTOR_BACKEND
+        self.fast_path_min_confidence = settings.QUERY_FAST_PATH_MIN_CONFIDENCE
+        self.stream_task_parse = settings.LLM_STREAM_TASK_PARSE
 
-    async def get_all_tasks(self, db: AsyncSession) -> list[TaskOutput]:
+    async def get_tasks_page(
+            self,
+            db: AsyncSession,
+            limit: int = 100,
+            cursor: Optional[str] = None
+    ) -> Tuple[List[TaskOutput], Optional[str]]:
+        """
+        Returns one page of tasks and the cursor for the next page (None on the last page).
+        Raises ValueError for a malformed cursor.
+        """
         repository = TaskRepository(db)
-        tasks = await repository.get_all()
-        return [TaskOutput.model_validate(task) for task in tasks]
+        after = decode_cursor(cursor) if cursor else None
+        # Fetch one extra row to know whether another page follows
+        tasks = await repository.get_page(limit=limit + 1, after=after)
+
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = encode_cursor(tasks[-1].due_date, tasks[-1].id)
+        return [TaskOutput.model_validate(task) for task in tasks], next_cursor
 
     async def parse_and_create_task(self, task_input: TaskInput, db: AsyncSession) -> TaskOutput:
         """Parses, generates embedding, and creates a new task in the database."""
 
         # Step 1: Parse task using LLM
-        response = self.llm_service.parse_task_description(task_input.description)
-        parsed_task = process_parsed_task(response=response, task_description=task_input.description)
+        embedding = None
+        if self.stream_task_parse:
+            parsed_task, embedding = await self._parse_task_streaming(task_input.description)
+        else:
+            response = await self.llm_service.parse_task_description(task_input.description)
+            parsed_task = process_parsed_task(response=response, task_description=task_input.description)
 
-        # Step 2: Use EmbeddingService to save the task
-        db_task = await self.embedding_service.save_task(db, parsed_task)
+        # Step 2: Save the task
+        if self.indexing_queue.inline:
+            # Embed and index before responding
+            db_task = await self.embedding_service.save_task(db, parsed_task, embedding=embedding)
+        else:
+            # Commit now; embedding and vector indexing run in the background
+            repository = TaskRepository(db)
+            db_task = await repository.create(task_row(parsed_task))
+            await self.indexing_queue.enqueue(db_task.id)
 
         return TaskOutput.model_validate(db_task)
 
+    async def _parse_task_streaming(self, description: str) -> Tuple[Dict[str, Any], Optional[List[float]]]:
+        """
+        Parses a task from a streamed completion. With inline indexing, the embedding
+        starts as soon as the task name is complete instead of after the whole answer;
+        the regex priority inference runs while the completion is in flight. Returns the
+        parsed task and the early embedding (None if it was not started or is stale).
+        """
+        early: Dict[str, Any] = {}
+
+        def on_field(field: str, value: Any) -> None:
+            if field == "name" and isinstance(value, str) and self.indexing_queue.inline:
+                early["name"] = value
+                early["embedding"] = asyncio.create_task(
+                    self.embedding_service.generate_task_embedding({"name": value})
+                )
+
+        parse = asyncio.create_task(self.llm_service.stream_task_description(description, on_field))
+        # Let the request go out first, then infer priority while waiting on the model
+        await asyncio.sleep(0)
+        inferred_priority = infer_priority(description)
+
+        try:
+            response = await parse
+            parsed_task = process_parsed_task(response, description, inferred_priority=inferred_priority)
+        except BaseException:
+            parse.cancel()
+            if "embedding" in early:
+                early["embedding"].cancel()
+            raise
+
+        if "embedding" not in early:
+            return parsed_task, None
+        if parsed_task.get("name") != early["name"]:
+            # The stream fell back to a fresh completion with a different name
+            early["embedding"].cancel()
+            return parsed_task, None
+        return parsed_task, await early["embedding"]
+
+    async def parse_and_create_tasks(self, batch_input: TaskBatchInput, db: AsyncSession) -> TaskBatchOutput:
+        """
+        Batch version of parse_and_create_task. Descriptions are parsed concurrently
+        (bounded by the LLM service's concurrency limit) and the parsed tasks are
+        embedded, inserted and indexed together. A failing description is reported
+        in its result entry without failing the rest of the batch.
+        """
+        descriptions = batch_input.descriptions
+        results: List[Optional[TaskBatchItemResult]] = [None] * len(descriptions)
+
+        # Step 1: Parse all descriptions using the LLM
+        async def parse(description: str) -> Dict[str, Any]:
+            response = await self.llm_service.parse_task_description(description)
+            return process_parsed_task(response=response, task_description=description)
+
+        parsed = await asyncio.gather(*(parse(d) for d in descriptions), return_exceptions=True)
+
+        parsed_indices, parsed_tasks = [], []
+        for i, outcome in enumerate(parsed):
+            if isinstance(outcome, Exception):
+                results[i] = TaskBatchItemResult(index=i, success=False, error=_error_message(outcome))
+            else:
+                parsed_indices.append(i)
+                parsed_tasks.append(outcome)
+
+        # Step 2: Embed, insert and index the parsed tasks together
+        if parsed_tasks:
+            try:
+                db_tasks = await self.embedding_service.save_tasks(db, parsed_tasks)
+                for i, db_task in zip(parsed_indices, db_tasks):
+                    results[i] = TaskBatchItemResult(index=i, success=True, task=TaskOutput.model_validate(db_task))
+            except Exception as e:
+                for i in parsed_indices:
+                    results[i] = TaskBatchItemResult(index=i, success=False, error=_error_message(e))
+
+        created = sum(1 for result in results if result.success)
+        return TaskBatchOutput(created=created, failed=len(results) - created, results=results)
+
     async def get_task_by_id(self, task_id: int, db: AsyncSession) -> Optional[TaskOutput]:
         repository = TaskRepository(db)
         task = await repository.get_by_id(task_id)
@@ -55,51 +182,215 @@ class TaskService:
             threshold: float = 0.7,
             max_results: int = 3
     ) -> List[TaskOutput]:
+        """
+        Semantic search over tasks. `threshold` is the maximum distance a match may
+        have (lower is more similar); falls back to full-text search when nothing matches.
+        Priority, category and due-date constraints in the query are applied as filters.
+        """
         try:
-            # Perform semantic search using Chroma
-            similar_docs = search_documents(query, k=10)
+            # Parse filters and embed the query concurrently; cached embeddings skip the API call
+            (filters, search_terms), query_embedding = await asyncio.gather(
+                self._parse_search_filters(query),
+                self.embedding_service.generate_embedding(query)
+            )
 
-            # Filter and sort documents based on similarity score
-            filtered_docs = [
-                (doc, score) for (doc, score) in similar_docs if score <= threshold
-            ]
+            if self.vector_backend == "pgvector":
+                task_outputs = await self._search_pgvector(db, query_embedding, threshold, max_results, filters)
+            else:
+                task_outputs = await self._search_chroma(db, query, query_embedding, threshold, max_results, filters)
+            if task_outputs:
+                return task_outputs
 
-            # Sort by similarity score (lower is more similar)
-            filtered_docs.sort(key=lambda x: x[1])
+            # Fallback to traditional search if no semantic matches
+            repository = TaskRepository(db)
+            tasks = await repository.search(
+                search_vector_query=search_terms or query,
+                priority=filters.priority,
+                category=filters.category,
+                start_date=filters.start_date,
+                end_date=filters.end_date
+            )
+            return [TaskOutput.model_validate(task) for task in tasks]
 
-            # Take top results
-            filtered_docs = filtered_docs[:max_results]
+        except Exception:
+            logger.exception("Search failed for query %r", query)
+            raise
 
-            # Extract task IDs from similar documents
-            similar_task_ids = [int(doc.metadata['task_id']) for doc, _ in filtered_docs]
+    async def hybrid_search(
+            self,
+            db: AsyncSession,
+            query: str,
+            text_weight: float = 1.0,
+            vector_weight: float = 1.0,
+            max_results: int = 3,
+            rrf_k: int = DEFAULT_RRF_K
+    ) -> List[TaskOutput]:
+        """
+        Runs the full-text and vector queries concurrently and merges them with
+        weighted reciprocal rank fusion. Each leg fetches a bounded candidate list,
+        so latency stays flat as the table grows. similarity_score holds the fused
+        score (higher is more relevant).
+        """
+        candidates = max(max_results * HYBRID_CANDIDATE_FACTOR, HYBRID_MIN_CANDIDATES)
+        (filters, search_terms), query_embedding = await asyncio.gather(
+            self._parse_search_filters(query),
+            self.embedding_service.generate_embedding(query)
+        )
 
-            # Fetch full task details from database
-            if similar_task_ids:
-                query = select(Task).where(Task.id.in_(similar_task_ids))
-                result = await db.execute(query)
-                tasks = result.scalars().all()
+        # Each leg uses its own session: one AsyncSession cannot run queries concurrently
+        async def text_leg() -> List[int]:
+            if not text_weight:
+                return []
+            async with SessionLocal() as leg_db:
+                return await TaskRepository(leg_db).rank_full_text(
+                    search_terms or query,
+                    limit=candidates,
+                    filters=filters
+                )
 
-                # Add similarity scores to the output
-                task_outputs = []
-                for task in tasks:
-                    task_output = TaskOutput.model_validate(task)
-                    # Find the corresponding similarity score
-                    matching_doc = next(
-                        (score for (doc, score) in filtered_docs if int(doc.metadata['task_id']) == task.id), None)
-                    task_output.similarity_score = matching_doc
-                    task_outputs.append(task_output)
+        async def vector_leg() -> List[int]:
+            if not vector_weight or query_embedding is None:
+                return []
+            if self.vector_backend == "pgvector":
+                async with SessionLocal() as leg_db:
+                    return await TaskRepository(leg_db).rank_by_embedding(
+                        query_embedding,
+                        limit=candidates,
+                        filters=filters
+                    )
+            similar_docs = await asyncio.to_thread(
+                search_documents_by_vector,
+                query_embedding,
+                k=candidates,
+                filter=_chroma_filter(filters)
+            )
+            return [int(doc.metadata['task_id']) for doc, _ in sorted(similar_docs, key=lambda x: x[1])]
 
-                return task_outputs
+        text_ids, vector_ids = await asyncio.gather(text_leg(), vector_leg())
+        fused = reciprocal_rank_fusion(
+            [(text_ids, text_weight), (vector_ids, vector_weight)],
+            k=rrf_k
+        )[:max_results]
+        if not fused:
+            return []
 
-            # Fallback to traditional search if no semantic matches
-            repository = TaskRepository(db)
-            tasks = await repository.search(search_vector_query=query)
-            return [TaskOutput.model_validate(task) for task in tasks]
+        # Hydrate only the final results
+        repository = TaskRepository(db)
+        task_ids = [task_id for task_id, _ in fused]
+        # Chroma cannot filter on due dates; the hydration query applies them
+        tasks = {task.id: task for task in await repository.get_tasks_by_ids(task_ids, filters=filters)}
+        return [
+            TaskOutput.model_validate(tasks[task_id]).model_copy(update={"similarity_score": score})
+            for task_id, score in fused
+            if task_id in tasks
+        ]
 
+    async def _parse_search_filters(self, query: str) -> Tuple[TaskFilters, Optional[str]]:
+        """
+        Extracts structured filters and the remaining search terms from the query.
+        Common phrasings are handled by the rule-based parser; the LLM is only
+        called when it is not confident. A failed parse means no filters, not a failed search.
+        """
+        parsed, confidence = parse_search_query_locally(query)
+        try:
+            if confidence >= self.fast_path_min_confidence:
+                SEARCH_QUERY_PARSES.inc(path="fast")
+            else:
+                SEARCH_QUERY_PARSES.inc(path="llm")
+                parsed = await self.llm_service.parse_search_query(query)
+            parsed = process_search_query(parsed)
         except Exception as e:
-            print(f"Search error: {str(e)}")
-            raise
+            logger.warning("Search query parsing failed, searching without filters: %s", e)
+            return TaskFilters(), None
+
+        search_terms = parsed.pop("search_terms")
+        return TaskFilters(**parsed), search_terms
+
+    async def _search_pgvector(
+            self,
+            db: AsyncSession,
+            query_embedding: Optional[List[float]],
+            threshold: float,
+            max_results: int,
+            filters: Optional[TaskFilters] = None
+    ) -> List[TaskOutput]:
+        """Similarity, filtering, thresholding and hydration in a single query on the HNSW index"""
+        if query_embedding is None:
+            return []
+
+        repository = TaskRepository(db)
+        matches = await repository.find_similar_by_embedding(
+            query_embedding,
+            max_distance=threshold,
+            limit=max_results,
+            filters=filters
+        )
+        return [
+            TaskOutput.model_validate(task).model_copy(update={"similarity_score": distance})
+            for task, distance in matches
+        ]
+
+    async def _search_chroma(
+            self,
+            db: AsyncSession,
+            query: str,
+            query_embedding: Optional[List[float]],
+            threshold: float,
+            max_results: int,
+            filters: Optional[TaskFilters] = None
+    ) -> List[TaskOutput]:
+        """Similarity search in the local Chroma store, then hydration from Postgres"""
+        if query_embedding is not None:
+            similar_docs = search_documents_by_vector(query_embedding, k=10, filter=_chroma_filter(filters))
+        else:
+            similar_docs = search_documents(query, k=10)
+
+        # Filter and sort documents based on similarity score
+        filtered_docs = [
+            (doc, score) for (doc, score) in similar_docs if score <= threshold
+        ]
+
+        # Sort by similarity score (lower is more similar)
+        filtered_docs.sort(key=lambda x: x[1])
+
+        # Take top results
+        filtered_docs = filtered_docs[:max_results]
+
+        # Extract task IDs from similar documents
+        similar_task_ids = [int(doc.metadata['task_id']) for doc, _ in filtered_docs]
+        if not similar_task_ids:
+            return []
+
+        # Fetch full task details from database (due-date filters apply here)
+        repository = TaskRepository(db)
+        tasks = await repository.get_tasks_by_ids(similar_task_ids, filters=filters)
+
+        # Add similarity scores to the output
+        task_outputs = []
+        for task in tasks:
+            task_output = TaskOutput.model_validate(task)
+            # Find the corresponding similarity score
+            matching_doc = next(
+                (score for (doc, score) in filtered_docs if int(doc.metadata['task_id']) == task.id), None)
+            task_output.similarity_score = matching_doc
+            task_outputs.append(task_output)
+
+        return task_outputs
 
 
+def _chroma_filter(filters: Optional[TaskFilters]) -> Optional[Dict[str, Any]]:
+    """Chroma metadata filter for the priority/category parts of `filters`"""
+    if not filters:
+        return None
+    clauses = [
+        {field: value}
+        for field, value in (("priority", filters.priority), ("category", filters.category))
+        if value
+    ]
+    if len(clauses) > 1:
+        return {"$and": clauses}
+    return clauses[0] if clauses else None
 
 
+def _error_message(error: Exception) -> str:
+    return error.detail if isinstance(error, HTTPException) else str(error)
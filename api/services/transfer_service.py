@@ -0,0 +1,283 @@
+import asyncio
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+from pgvector.utils import Vector
+
+from api.config import get_settings
+from api.database import SessionLocal
+from api.models.schemas import TaskImportOutput
+from api.repositories.task_repository import TaskRepository
+from api.services.llm_service import LLMService
+from api.utils.constants import EmbeddingStatus
+from api.utils.postprocess import process_parsed_task
+
+# Rows per COPY (and per transaction) on import
+IMPORT_CHUNK_SIZE = 5000
+# Import errors reported back; the count covers the rest
+MAX_REPORTED_ERRORS = 100
+# Export chunks buffered between COPY and a slow reader before COPY waits
+EXPORT_BUFFER_CHUNKS = 16
+
+
+class TaskTransferService:
+    """
+    Bulk import and export of tasks as NDJSON (or Parquet, from the CLI).
+
+    Export streams COPY output straight from Postgres. Import writes chunks of
+    IMPORT_CHUNK_SIZE rows with COPY; rows that already carry a name are stored
+    as-is, rows with only a description go through the LLM parser first.
+    Embeddings travel as base64 pgvector binary; rows without a usable one are
+    imported pending, for the backfill-embeddings command to pick up.
+    With VECTOR_BACKEND=chroma every row is imported pending, since COPY does not
+    write to Chroma; reindex-missing then adds them to the Chroma store.
+    """
+
+    def __init__(self, llm_service: LLMService):
+        self.llm_service = llm_service
+        settings = get_settings()
+        self.vector_dimension = settings.EMBEDDING_DIMENSION
+        self.index_in_chroma = settings.VECTOR_BACKEND == "chroma"
+
+    async def export_ndjson(self, include_embedding: bool = True) -> AsyncIterator[bytes]:
+        """
+        Yields NDJSON chunks as COPY produces them. COPY runs in a background task
+        on its own session and pauses while the buffer is full, so a slow client
+        holds back the query instead of growing memory.
+        """
+        buffer: asyncio.Queue = asyncio.Queue(maxsize=EXPORT_BUFFER_CHUNKS)
+        done = object()
+
+        async def copy() -> None:
+            try:
+                async with SessionLocal() as db:
+                    await TaskRepository(db).export_ndjson(buffer.put, include_embedding=include_embedding)
+            except Exception as e:
+                # Handed to the reader, which re-raises it
+                await buffer.put(e)
+            else:
+                await buffer.put(done)
+
+        copy_task = asyncio.create_task(copy())
+        try:
+            while (chunk := await buffer.get()) is not done:
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            # Stops COPY if the reader went away early
+            copy_task.cancel()
+
+    async def import_rows(
+            self,
+            rows: AsyncIterator[Union[str, bytes, Dict[str, Any]]],
+            parse: bool = False
+    ) -> TaskImportOutput:
+        """
+        Imports NDJSON lines (or already decoded dicts) chunk by chunk.
+        With parse, every row is re-parsed from its description by the LLM.
+        """
+        result = TaskImportOutput(imported=0, failed=0, errors=[])
+        chunk: List[Tuple[int, Dict[str, Any]]] = []
+        line_number = 0
+
+        async for row in rows:
+            line_number += 1
+            if isinstance(row, (str, bytes)):
+                if not row.strip():
+                    continue
+                try:
+                    row = json.loads(row)
+                except ValueError as e:
+                    _record_error(result, line_number, f"invalid JSON: {e}")
+                    continue
+            if not isinstance(row, dict):
+                _record_error(result, line_number, "expected a JSON object")
+                continue
+            chunk.append((line_number, row))
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                await self._import_chunk(chunk, parse, result)
+                chunk = []
+
+        if chunk:
+            await self._import_chunk(chunk, parse, result)
+        return result
+
+    async def _import_chunk(
+            self,
+            chunk: List[Tuple[int, Dict[str, Any]]],
+            parse: bool,
+            result: TaskImportOutput
+    ) -> None:
+        # Rows needing the LLM are parsed concurrently (bounded by LLMService's semaphore)
+        to_parse = [(line, row) for line, row in chunk if parse or not row.get("name")]
+        parsed = await asyncio.gather(
+            *(self._parse_row(row) for _, row in to_parse),
+            return_exceptions=True
+        )
+        parsed_by_line = dict(zip((line for line, _ in to_parse), parsed))
+
+        records = []
+        for line, row in chunk:
+            row = parsed_by_line.get(line, row)
+            try:
+                if isinstance(row, Exception):
+                    raise row
+                records.append(self._record(row))
+            except Exception as e:
+                _record_error(result, line, str(getattr(e, "detail", e)))
+
+        if records:
+            try:
+                async with SessionLocal() as db:
+                    result.imported += await TaskRepository(db).copy_tasks(records)
+            except Exception as e:
+                # COPY is all-or-nothing per chunk
+                result.failed += len(records)
+                if len(result.errors) < MAX_REPORTED_ERRORS:
+                    result.errors.append(f"lines {chunk[0][0]}-{chunk[-1][0]}: {len(records)} rows not imported: {e}")
+
+    async def _parse_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        description = row.get("description") or row.get("name")
+        if not description:
+            raise ValueError("row has neither a name nor a description")
+        response = await self.llm_service.parse_task_description(description)
+        return process_parsed_task(response=response, task_description=description)
+
+    def _record(self, row: Dict[str, Any]) -> Tuple[Any, ...]:
+        """COPY record for a structured row, in COPY_COLUMNS order"""
+        name = row.get("name")
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError("name is required")
+
+        embedding = _decode_embedding(row.get("embedding"))
+        if embedding is not None and embedding.shape[0] != self.vector_dimension:
+            # Vectors from another model are dropped; the task is re-embedded later
+            embedding = None
+        # Only pgvector search sees the imported vector; Chroma needs the reindexer
+        ready = embedding is not None and not self.index_in_chroma
+        status = EmbeddingStatus.READY if ready else EmbeddingStatus.PENDING
+
+        # Checked here so one bad row fails alone instead of failing the chunk's COPY
+        confidence_score = row.get("confidence_score")
+        confidence_score = 50 if confidence_score is None else int(confidence_score)
+        if not 0 <= confidence_score <= 100:
+            raise ValueError("confidence_score must be between 0 and 100")
+        priority_source = row.get("priority_source") or "ai"
+        if priority_source not in ("ai", "regex"):
+            raise ValueError(f"invalid priority_source {priority_source!r}")
+
+        # Missing timestamps are filled in by copy_tasks with the database clock
+        return (
+            name.strip(),
+            _parse_date(row.get("due_date")),
+            row.get("priority"),
+            row.get("category"),
+            confidence_score,
+            priority_source,
+            status.value,
+            embedding,
+            _parse_datetime(row.get("created_at")),
+            _parse_datetime(row.get("updated_at"))
+        )
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Splits a byte stream (e.g. a request body) into lines without buffering it whole"""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
+async def iter_rows(rows: Iterable[Any]) -> AsyncIterator[Any]:
+    """Adapts a synchronous row iterator (a file, Parquet batches) to import_rows"""
+    for row in rows:
+        yield row
+
+
+# Parquet layout of an exported task; the embedding is raw pgvector binary
+PARQUET_FIELDS = (
+    ("id", "int64"), ("name", "string"), ("due_date", "date32"), ("priority", "string"),
+    ("category", "string"), ("confidence_score", "int32"), ("priority_source", "string"),
+    ("embedding_status", "string"), ("created_at", "timestamp"), ("updated_at", "timestamp"),
+    ("embedding", "binary")
+)
+PARQUET_ROW_GROUP_SIZE = 50000
+
+
+async def write_parquet(ndjson_chunks: AsyncIterator[bytes], path: str) -> int:
+    """Writes an NDJSON export to a Parquet file, one row group at a time. Returns the row count."""
+    # Imported lazily so pyarrow (requirements-parquet.txt) is only required for Parquet
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {
+        "int64": pa.int64(), "int32": pa.int32(), "string": pa.string(), "date32": pa.date32(),
+        "timestamp": pa.timestamp("us"), "binary": pa.binary()
+    }
+    schema = pa.schema([(name, types[kind]) for name, kind in PARQUET_FIELDS])
+
+    def to_row(line: bytes) -> Dict[str, Any]:
+        row = json.loads(line)
+        row["due_date"] = _parse_date(row.get("due_date"))
+        row["created_at"] = _parse_datetime(row.get("created_at"))
+        row["updated_at"] = _parse_datetime(row.get("updated_at"))
+        row["embedding"] = base64.b64decode(row["embedding"]) if row.get("embedding") else None
+        return row
+
+    count, rows = 0, []
+    with pq.ParquetWriter(path, schema) as writer:
+        async for line in iter_lines(ndjson_chunks):
+            if not line.strip():
+                continue
+            rows.append(to_row(line))
+            if len(rows) >= PARQUET_ROW_GROUP_SIZE:
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                count, rows = count + len(rows), []
+        if rows:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            count += len(rows)
+    return count
+
+
+def read_parquet_rows(path: str) -> Iterable[Dict[str, Any]]:
+    """Rows of a Parquet export, read one batch at a time"""
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=IMPORT_CHUNK_SIZE):
+        yield from batch.to_pylist()
+
+
+def _record_error(result: TaskImportOutput, line: int, message: str) -> None:
+    result.failed += 1
+    if len(result.errors) < MAX_REPORTED_ERRORS:
+        result.errors.append(f"line {line}: {message}")
+
+
+def _decode_embedding(value: Union[str, bytes, None]) -> Optional[np.ndarray]:
+    """Accepts pgvector binary as raw bytes (Parquet) or base64 text (NDJSON)"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = base64.b64decode(value)
+    return Vector.from_binary(value).to_numpy().astype(np.float32)
+
+
+def _parse_date(value: Any) -> Optional[date]:
+    if not value:
+        return None
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _parse_datetime(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
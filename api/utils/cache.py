@@ -0,0 +1,179 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from api.utils.metrics import counter, CACHE_HIT_RATIO
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = counter(
+    "taskagent_cache_requests_total",
+    "Cache lookups by cache name and outcome (memory_hit, redis_hit, miss, coalesced)",
+    labels=("cache", "result")
+)
+
+
+class LRUCache:
+    """In-process LRU cache with an optional per-entry TTL (seconds, 0 = no expiry)"""
+
+    def __init__(self, max_size: int, ttl: float = 0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache:
+    """Shared cache tier in Redis; entries expire via Redis TTL"""
+
+    def __init__(
+            self,
+            url: str,
+            namespace: str,
+            ttl: float = 0,
+            encode: Callable[[Any], bytes] = lambda value: json.dumps(value).encode(),
+            decode: Callable[[bytes], Any] = json.loads
+    ):
+        # Imported lazily so redis is only required when a Redis tier is configured
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.namespace = namespace
+        self.ttl = ttl
+        self.encode = encode
+        self.decode = decode
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(f"{self.namespace}:{key}")
+        return None if raw is None else self.decode(raw)
+
+    async def set(self, key: str, value: Any) -> None:
+        await self.client.set(
+            f"{self.namespace}:{key}",
+            self.encode(value),
+            ex=int(self.ttl) if self.ttl else None
+        )
+
+
+class TieredCache:
+    """
+    Read-through cache: in-process LRU first, then an optional Redis tier.
+    Redis failures are treated as misses so the cache never fails a request.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            max_size: int,
+            ttl: float = 0,
+            redis_url: Optional[str] = None,
+            **redis_kwargs
+    ):
+        self.name = name
+        self.memory = LRUCache(max_size=max_size, ttl=ttl)
+        self.redis = RedisCache(redis_url, namespace=name, ttl=ttl, **redis_kwargs) if redis_url else None
+        # Loads in flight per key, so concurrent misses share one call
+        self._inflight: Dict[str, asyncio.Future] = {}
+        CACHE_HIT_RATIO.set_function(self.hit_rate, cache=name)
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            CACHE_REQUESTS.inc(cache=self.name, result="memory_hit")
+            return value
+
+        if self.redis is not None:
+            try:
+                value = await self.redis.get(key)
+            except Exception as e:
+                logger.warning("%s cache: Redis get failed: %s", self.name, e)
+                value = None
+            if value is not None:
+                CACHE_REQUESTS.inc(cache=self.name, result="redis_hit")
+                self.memory.set(key, value)
+                return value
+
+        CACHE_REQUESTS.inc(cache=self.name, result="miss")
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.redis is not None:
+            try:
+                await self.redis.set(key, value)
+            except Exception as e:
+                logger.warning("%s cache: Redis set failed: %s", self.name, e)
+
+    async def get_or_load(
+            self,
+            key: str,
+            load: Callable[[], Awaitable[Any]],
+            cacheable: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Returns the cached value, or awaits load() and caches its result.
+        Concurrent callers missing on the same key wait for a single load();
+        failures are propagated to all of them and nothing is cached. Results
+        for which cacheable(value) is false are returned but not cached.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            CACHE_REQUESTS.inc(cache=self.name, result="coalesced")
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await load()
+            if cacheable is None or cacheable(value):
+                await self.set(key, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody else awaited is not logged
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+            if not future.done():
+                # The loading caller was cancelled; waiters see the cancellation
+                future.cancel()
+
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from either tier since startup"""
+        hits = (CACHE_REQUESTS.value(cache=self.name, result="memory_hit")
+                + CACHE_REQUESTS.value(cache=self.name, result="redis_hit"))
+        total = hits + CACHE_REQUESTS.value(cache=self.name, result="miss")
+        return hits / total if total else 0.0
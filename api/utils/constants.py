@@ -2,7 +2,8 @@ import re
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import Dict, Any, List, Tuple
+from types import MappingProxyType
+from typing import Dict, Any, List, Tuple, NamedTuple, Sequence, Optional, Set
 
 
 class Priority(str, Enum):
@@ -12,6 +13,12 @@ class Priority(str, Enum):
     UNKNOWN = "Unknown"
 
 
+class EmbeddingStatus(str, Enum):
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+
+
 class Category(str, Enum):
     WORK = "Work"
     PERSONAL = "Personal"
@@ -19,6 +26,15 @@ class Category(str, Enum):
     OTHER = "Other"
 
 
+# Words that carry no meaning for full-text ranking
+QUERY_FILLER_WORDS = frozenset({'show', 'me', 'all', 'tasks', 'task', 'find', 'list', 'my'})
+
+# Words that full-text search drops because they name filters or are filler
+SEARCH_KEYWORDS = frozenset({
+    'priority', 'high', 'medium', 'low', 'show', 'me', 'all', 'tasks', 'finance', 'work', 'personal'
+})
+
+
 @dataclass
 class PriorityResult:
     priority: Priority
@@ -27,100 +43,156 @@ class PriorityResult:
     reasoning: Dict[str, Any] = None
 
 
-class PriorityIndicator:
-    def __init__(self, patterns: List[str], weight: int):
-        self.patterns = [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
-        self.weight = weight
-
-
-class PriorityInference:
-    def __init__(self):
-        # Priority patterns with weights
-        self.high_indicators = [
-            # Explicit urgency
-            PriorityIndicator([
-                r"urgent",
-                r"asap",
-                r"emergency",
-                r"critical",
-                r"immediate(ly)?",
-                r"right away",
-            ], 10),
-
-            # Deadline indicators
-            PriorityIndicator([
-                r"by (today|tomorrow|tonight)",
-                r"due (today|tomorrow|tonight)",
-                r"within \d+ hours?",
-                r"end of( the)? day",
-            ], 8),
-
-            # Important stakeholders
-            PriorityIndicator([
-                r"(boss|client|customer) (needs|wants|requested)",
-                r"executive",
-                r"CEO",
-                r"board meeting",
-            ], 7),
-
-            # Financial/Legal implications
-            PriorityIndicator([
-                r"deadline",
-                r"tax",
-                r"legal",
-                r"compliance",
-                r"regulatory",
-            ], 6)
-        ]
-
-        self.medium_indicators = [
-            # Time-bound but not urgent
-            PriorityIndicator([
-                r"this week",
-                r"next week",
-                r"upcoming",
-                r"soon",
-                r"schedule[d]?",
-            ], 5),
-
-            # Project-related
-            PriorityIndicator([
-                r"project",
-                r"meeting",
-                r"presentation",
-                r"report",
-                r"review",
-            ], 4),
-
-            # Follow-up activities
-            PriorityIndicator([
-                r"follow[- ]?up",
-                r"check[- ]?in",
-                r"update",
-            ], 3)
-        ]
-
-        self.low_indicators = [
-            # Optional/Flexible tasks
-            PriorityIndicator([
-                r"when possible",
-                r"if you can",
-                r"would be nice",
-                r"maybe",
-                r"consider",
-            ], 2),
-
-            # Maintenance/Routine
-            PriorityIndicator([
-                r"routine",
-                r"regular",
-                r"maintenance",
-                r"organize",
-                r"clean",
-            ], 1)
-        ]
-
-    def infer_priority(self, task_description: str, current_priority: str = "Unknown") -> Tuple[str, dict]:
+class PriorityIndicator(NamedTuple):
+    patterns: Tuple[str, ...]
+    weight: int
+
+
+# Priority patterns with weights, by level
+PRIORITY_INDICATORS: Dict[str, Tuple[PriorityIndicator, ...]] = MappingProxyType({
+    "high": (
+        # Explicit urgency
+        PriorityIndicator((
+            r"urgent",
+            r"asap",
+            r"emergency",
+            r"critical",
+            r"immediate(ly)?",
+            r"right away",
+        ), 10),
+
+        # Deadline indicators
+        PriorityIndicator((
+            r"by (today|tomorrow|tonight)",
+            r"due (today|tomorrow|tonight)",
+            r"within \d+ hours?",
+            r"end of( the)? day",
+        ), 8),
+
+        # Important stakeholders
+        PriorityIndicator((
+            r"(boss|client|customer) (needs|wants|requested)",
+            r"executive",
+            r"CEO",
+            r"board meeting",
+        ), 7),
+
+        # Financial/Legal implications
+        PriorityIndicator((
+            r"deadline",
+            r"tax",
+            r"legal",
+            r"compliance",
+            r"regulatory",
+        ), 6)
+    ),
+    "medium": (
+        # Time-bound but not urgent
+        PriorityIndicator((
+            r"this week",
+            r"next week",
+            r"upcoming",
+            r"soon",
+            r"schedule[d]?",
+        ), 5),
+
+        # Project-related
+        PriorityIndicator((
+            r"project",
+            r"meeting",
+            r"presentation",
+            r"report",
+            r"review",
+        ), 4),
+
+        # Follow-up activities
+        PriorityIndicator((
+            r"follow[- ]?up",
+            r"check[- ]?in",
+            r"update",
+        ), 3)
+    ),
+    "low": (
+        # Optional/Flexible tasks
+        PriorityIndicator((
+            r"when possible",
+            r"if you can",
+            r"would be nice",
+            r"maybe",
+            r"consider",
+        ), 2),
+
+        # Maintenance/Routine
+        PriorityIndicator((
+            r"routine",
+            r"regular",
+            r"maintenance",
+            r"organize",
+            r"clean",
+        ), 1)
+    ),
+})
+
+_DUE_DATE_PATTERN = re.compile(r"due.*?(\d{4}-\d{2}-\d{2})")
+_LEADING_ALTERNATION = re.compile(r"\(([a-z|]+)\)", re.IGNORECASE)
+
+
+def _leading_chars(pattern: str) -> Optional[Set[str]]:
+    """Lowercase characters a match of `pattern` can start with, or None if not obvious"""
+    if pattern[0].isalpha():
+        return {pattern[0].lower()}
+    if group := _LEADING_ALTERNATION.match(pattern):
+        return {alternative[0].lower() for alternative in group.group(1).split("|")}
+    return None
+
+
+class PriorityEngine:
+    """
+    Compiled, immutable priority scorer.
+
+    All indicator patterns are merged into one alternation with a named group
+    per pattern, so a description is scanned once instead of once per pattern.
+    The alternation sits inside a lookahead so overlapping indicators (e.g.
+    "board meeting" and "meeting") still both match, as they did when each
+    pattern was searched separately. Each pattern counts once, at its first
+    occurrence.
+
+    Alternatives are grouped by their leading character and the scan is
+    guarded by the set of possible leading characters, so most positions are
+    rejected with one character test instead of trying every alternative.
+    """
+
+    __slots__ = ("_pattern", "_groups")
+
+    def __init__(self, indicators: Dict[str, Sequence[PriorityIndicator]]):
+        branches: Dict[str, List[str]] = {}
+        groups = {}
+        guard = set()
+        for level, level_indicators in indicators.items():
+            for indicator in level_indicators:
+                for pattern in indicator.patterns:
+                    name = f"p{len(groups)}"
+                    groups[name] = (level, indicator.weight)
+
+                    leading = _leading_chars(pattern)
+                    guard = guard | leading if guard is not None and leading else None
+                    branch = next(iter(leading)) if leading and len(leading) == 1 else ""
+                    branches.setdefault(branch, []).append(f"(?P<{name}>{pattern})")
+
+        alternation = "|".join(
+            (f"(?={re.escape(char)})" if char else "") + f"(?:{'|'.join(alternatives)})"
+            for char, alternatives in branches.items()
+        )
+        prefix = f"(?=[{re.escape(''.join(sorted(guard)))}])" if guard else ""
+        self._pattern = re.compile(f"{prefix}(?=(?:{alternation}))", re.IGNORECASE)
+        self._groups = MappingProxyType(groups)
+
+    def __setattr__(self, name, value):
+        if hasattr(self, "_groups"):
+            raise AttributeError("PriorityEngine is immutable")
+        super().__setattr__(name, value)
+
+    def infer_priority(self, task_description: str, current_priority: str = "Unknown") -> Tuple[Priority, dict]:
         """
         Infer task priority with detailed reasoning.
 
@@ -140,7 +212,7 @@ class PriorityInference:
         }
 
         # Check for date patterns
-        due_date_match = re.search(r"due.*?(\d{4}-\d{2}-\d{2})", task_description)
+        due_date_match = _DUE_DATE_PATTERN.search(task_description)
         if due_date_match:
             try:
                 due_date = datetime.strptime(due_date_match.group(1), "%Y-%m-%d").date()
@@ -155,17 +227,17 @@ class PriorityInference:
             except ValueError:
                 pass
 
-        # Check all indicators
-        for priority, indicators in [
-            ("high", self.high_indicators),
-            ("medium", self.medium_indicators),
-            ("low", self.low_indicators)
-        ]:
-            for indicator in indicators:
-                for pattern in indicator.patterns:
-                    if found := pattern.search(task_description):
-                        scores[priority] += indicator.weight
-                        matches[priority].append(f"Matched: {found.group()}")
+        # Single scan for all indicators; keep the first occurrence of each pattern
+        found = {}
+        for match in self._pattern.finditer(task_description):
+            if match.lastgroup not in found:
+                found[match.lastgroup] = match.group(match.lastgroup)
+
+        # Report in indicator order, as the per-pattern scan did
+        for name in sorted(found, key=lambda group: int(group[1:])):
+            level, weight = self._groups[name]
+            scores[level] += weight
+            matches[level].append(f"Matched: {found[name]}")
 
         # Consider current priority if not unknown
         if current_priority.lower() in scores:
@@ -188,6 +260,30 @@ class PriorityInference:
 
         return final_priority, reasoning
 
+    def infer_priorities(self, task_descriptions: Sequence[str]) -> List[Tuple[Priority, dict]]:
+        """Score a list of descriptions with the shared compiled pattern"""
+        return [self.infer_priority(task_description) for task_description in task_descriptions]
+
+
+# Compiled once at import and shared by every caller
+PRIORITY_ENGINE = PriorityEngine(PRIORITY_INDICATORS)
+
+
+class PriorityInference:
+    """Priority inference backed by the shared compiled PRIORITY_ENGINE"""
+
+    def __init__(self, engine: PriorityEngine = PRIORITY_ENGINE):
+        self.engine = engine
+
+    def infer_priority(self, task_description: str, current_priority: str = "Unknown") -> Tuple[str, dict]:
+        """
+        Infer task priority with detailed reasoning.
+
+        Returns:
+            Tuple of (priority, reasoning_dict)
+        """
+        return self.engine.infer_priority(task_description, current_priority)
+
     def explain_priority(self, task_description: str) -> str:
         """Generate human-readable explanation of priority inference"""
         priority, reasoning = self.infer_priority(task_description)
@@ -203,4 +299,4 @@ class PriorityInference:
         for level, score in reasoning["scores"].items():
             explanation.append(f"- {level.title()}: {score}")
 
-        return "\n".join(explanation)
\ No newline at end of file
+        return "\n".join(explanation)
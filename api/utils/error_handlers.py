@@ -1,38 +1,38 @@
 from fastapi import Request
+from fastapi.exception_handlers import http_exception_handler as default_http_exception_handler
 from fastapi.responses import JSONResponse
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from openai import AuthenticationError, RateLimitError, APIError, OpenAIError
 
+from api.utils.metrics import ERRORS
+
+
+def _error_response(exc: Exception, status_code: int, detail: str) -> JSONResponse:
+    ERRORS.inc(exception=type(exc).__name__, status=str(status_code))
+    return JSONResponse(status_code=status_code, content={"detail": detail})
+
 
 async def openai_error_handler(request: Request, exc: OpenAIError):
-    return JSONResponse(
-        status_code=500,
-        content={"detail": f"OpenAI Exception: {str(exc)}"},
-    )
+    return _error_response(exc, 500, f"OpenAI Exception: {str(exc)}")
 
 
 async def auth_error_handler(request: Request, exc: AuthenticationError):
-    return JSONResponse(
-        status_code=401,
-        content={"detail": f"OpenAI Authentication Error: {str(exc)}"},
-    )
+    return _error_response(exc, 401, f"OpenAI Authentication Error: {str(exc)}")
 
 
 async def rate_limit_error_handler(request: Request, exc: RateLimitError):
-    return JSONResponse(
-        status_code=429,
-        content={"detail": f"OpenAI Rate Limit Exceeded: {str(exc)}"},
-    )
+    return _error_response(exc, 429, f"OpenAI Rate Limit Exceeded: {str(exc)}")
 
 
 async def api_error_handler(request: Request, exc: APIError):
-    return JSONResponse(
-        status_code=502,
-        content={"detail": f"OpenAI API Error: {str(exc)}"},
-    )
+    return _error_response(exc, 502, f"OpenAI API Error: {str(exc)}")
 
 
 async def generic_exception_handler(request: Request, exc: Exception):
-    return JSONResponse(
-        status_code=500,
-        content={"detail": f"Internal Server Error: {str(exc)}"},
-    )
+    return _error_response(exc, 500, f"Internal Server Error: {str(exc)}")
+
+
+async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+    # Services report most failures as HTTPException; count them, then respond as FastAPI would
+    ERRORS.inc(exception=type(exc).__name__, status=str(exc.status_code))
+    return await default_http_exception_handler(request, exc)
@@ -0,0 +1,111 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from api.config import get_settings
+
+# Set per HTTP request by the middleware in api/main.py
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+# Whether this request's debug events are kept (decided once per request)
+debug_sampled_var: ContextVar[Optional[bool]] = ContextVar("debug_sampled", default=None)
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, request_id and any extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Stamps records with the current request id and samples DEBUG records, so
+    hot-path debug events cost almost nothing at LOG_LEVEL=DEBUG under load.
+    Within a request the sampling decision is shared, keeping its events together.
+    """
+
+    def __init__(self, debug_sample_rate: float):
+        super().__init__()
+        self.debug_sample_rate = debug_sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        if record.levelno > logging.DEBUG or self.debug_sample_rate >= 1:
+            return True
+        sampled = debug_sampled_var.get()
+        if sampled is None:
+            sampled = random.random() < self.debug_sample_rate
+        return sampled
+
+
+def start_request(request_id: Optional[str] = None) -> str:
+    """Binds a request id (and the request's debug sampling decision) to the current context"""
+    request_id = request_id or uuid.uuid4().hex
+    request_id_var.set(request_id)
+    debug_sampled_var.set(random.random() < get_settings().LOG_DEBUG_SAMPLE_RATE)
+    return request_id
+
+
+def configure_logging() -> None:
+    """
+    Routes all logging through a queue: callers only format and enqueue the record,
+    and a background thread writes it to stdout. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    settings = get_settings()
+    log_queue: queue.Queue = queue.Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    # Filtered and formatted on the caller's side, where the request context is visible;
+    # the listener thread only writes the finished line
+    queue_handler.addFilter(ContextFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+    queue_handler.setFormatter(
+        JsonFormatter() if settings.LOG_JSON
+        else logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s")
+    )
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    # SQL statements go through the same queue instead of SQLAlchemy's own stdout handler
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if settings.DB_ECHO else logging.WARNING)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Flushes queued records (called on shutdown)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,271 @@
+import bisect
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Tuple, Sequence, Union
+
+
+class Counter:
+    """Monotonic counter, optionally split by label values"""
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Histogram:
+    """Distribution of observed values over fixed upper-bound buckets, optionally split by labels"""
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float], labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.labels = tuple(labels)
+        # Per label set: (count per bucket, with a final +Inf bucket), sum, count
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float, int]] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            bucket_counts, total, count = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0, 0)
+            bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (bucket_counts, total + value, count + 1)
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def mean(self, **labels: str) -> float:
+        entry = self._values.get(self._key(labels))
+        return entry[1] / entry[2] if entry else 0.0
+
+    def samples(self) -> Dict[Tuple[str, ...], Tuple[List[int], float, int]]:
+        with self._lock:
+            return {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+
+
+class Gauge:
+    """Value that goes up and down; either set directly or read from a callback at export time"""
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float], **labels: str) -> None:
+        """Reports function() for these labels, read at export time, instead of a stored value"""
+        with self._lock:
+            self._functions[self._key(labels)] = function
+
+    def value(self, **labels: str) -> float:
+        key = self._key(labels)
+        function = self._functions.get(key)
+        return function() if function else self._values.get(key, 0)
+
+    def samples(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        values.update((key, function()) for key, function in functions.items())
+        return values
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+_registry: Dict[str, Metric] = {}
+_registry_lock = threading.Lock()
+
+
+def _register(name: str, create) -> Metric:
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = create()
+        return _registry[name]
+
+
+def counter(name: str, description: str, labels: Sequence[str] = ()) -> Counter:
+    """Returns the counter registered under `name`, creating it on first use"""
+    return _register(name, lambda: Counter(name, description, labels))
+
+
+def gauge(name: str, description: str, labels: Sequence[str] = ()) -> Gauge:
+    """Returns the gauge registered under `name`, creating it on first use"""
+    return _register(name, lambda: Gauge(name, description, labels))
+
+
+def histogram(name: str, description: str, buckets: Sequence[float], labels: Sequence[str] = ()) -> Histogram:
+    """Returns the histogram registered under `name`, creating it on first use"""
+    return _register(name, lambda: Histogram(name, description, buckets, labels))
+
+
+def registry() -> Dict[str, Metric]:
+    return dict(_registry)
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_prometheus() -> str:
+    """Every registered metric in the Prometheus text exposition format"""
+    lines = []
+    for name, metric in sorted(registry().items()):
+        kind = {Counter: "counter", Gauge: "gauge", Histogram: "histogram"}[type(metric)]
+        lines.append(f"# HELP {name} {metric.description}")
+        lines.append(f"# TYPE {name} {kind}")
+        if isinstance(metric, Histogram):
+            for key, (bucket_counts, total, count) in sorted(metric.samples().items()):
+                cumulative = 0
+                for bound, bucket_count in zip(list(metric.buckets) + ["+Inf"], bucket_counts):
+                    cumulative += bucket_count
+                    le = f'le="{bound}"'
+                    lines.append(f"{name}_bucket{_label_text(metric.labels, key, le)} {cumulative}")
+                lines.append(f"{name}_sum{_label_text(metric.labels, key)} {total}")
+                lines.append(f"{name}_count{_label_text(metric.labels, key)} {count}")
+        else:
+            for key, value in sorted(metric.samples().items()):
+                lines.append(f"{name}{_label_text(metric.labels, key)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+EMBEDDING_API_CALLS = counter(
+    "taskagent_embedding_api_calls_total",
+    "Embedding API requests sent to the provider",
+    labels=("source",)
+)
+
+EMBEDDING_BATCH_SIZE = histogram(
+    "taskagent_embedding_batch_size",
+    "Inputs per embeddings request sent by the embedding dispatcher",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048)
+)
+
+SEARCH_QUERY_PARSES = counter(
+    "taskagent_search_query_parses_total",
+    "Search queries parsed, by path (fast = rule-based, llm = model call)",
+    labels=("path",)
+)
+
+STAGE_SECONDS = histogram(
+    "taskagent_stage_duration_seconds",
+    "Latency of each create/search pipeline stage "
+    "(llm_parse_task, llm_parse_query, embedding, db_insert, chroma_insert, text_search, vector_search, hydration)",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    labels=("stage",)
+)
+
+LLM_TOKENS = counter(
+    "taskagent_llm_tokens_total",
+    "Tokens reported in OpenAI response usage, by operation and kind (prompt, completion)",
+    labels=("operation", "kind")
+)
+
+LLM_STREAM_FALLBACKS = counter(
+    "taskagent_llm_stream_fallbacks_total",
+    "Streamed task parses that lost their early fields, by reason (malformed_json, stream_error)",
+    labels=("reason",)
+)
+
+ERRORS = counter(
+    "taskagent_errors_total",
+    "Error responses returned by the API, by exception type and status code",
+    labels=("exception", "status")
+)
+
+CACHE_HIT_RATIO = gauge(
+    "taskagent_cache_hit_ratio",
+    "Share of lookups served from either cache tier since startup",
+    labels=("cache",)
+)
+
+
+@contextmanager
+def time_stage(stage: str) -> Iterator[None]:
+    """Records the block's duration, including failures, under the stage label"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+
+
+def timed(stage: str):
+    """Decorator form of time_stage for sync and async functions"""
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+            @wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with time_stage(stage):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with time_stage(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_token_usage(operation: str, usage) -> None:
+    """Adds an OpenAI `response.usage` to the token counters (usage may be None)"""
+    if usage is None:
+        return
+    LLM_TOKENS.inc(usage.prompt_tokens or 0, operation=operation, kind="prompt")
+    LLM_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, operation=operation, kind="completion")
+
+
+def fast_path_hit_rate() -> float:
+    """Share of search queries parsed without calling the LLM"""
+    fast = SEARCH_QUERY_PARSES.value(path="fast")
+    total = fast + SEARCH_QUERY_PARSES.value(path="llm")
+    return fast / total if total else 0.0
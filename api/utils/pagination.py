@@ -0,0 +1,25 @@
+import base64
+import json
+from datetime import date
+from typing import Optional, Tuple
+
+# Keyset position of a task in (due_date NULLS LAST, id) order
+Cursor = Tuple[Optional[date], int]
+
+
+def encode_cursor(due_date: Optional[date], task_id: int) -> str:
+    """Encodes the sort key of the last task on a page as an opaque token"""
+    payload = json.dumps([due_date.isoformat() if due_date else None, task_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Decodes a token produced by encode_cursor.
+    Raises ValueError if the token is malformed.
+    """
+    try:
+        due_date, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (date.fromisoformat(due_date) if due_date else None), int(task_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
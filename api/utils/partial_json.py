@@ -0,0 +1,113 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+_WHITESPACE = " \t\r\n"
+
+
+class PartialJSONObject:
+    """
+    Incremental parser for a JSON object that arrives in pieces (a streamed
+    completion). feed() returns each top-level field as soon as its value is
+    complete, so callers can act on early fields before the object is finished.
+
+    Values are decoded with json.loads once their extent is known; nested
+    objects and arrays are reported whole. Raises ValueError on input that
+    cannot be a single JSON object, after which the parser must not be reused.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.fields: Dict[str, Any] = {}
+        self._pos = 0
+        self._state = "open"
+        self._key: Optional[str] = None
+        # Start of the key or value being scanned
+        self._start = 0
+        # Bracket depth inside a nested value
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def complete(self) -> bool:
+        """True once the closing brace of the object has been seen"""
+        return self._state == "done"
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Adds the next piece of text; returns the (field, value) pairs it completed"""
+        self.text += chunk
+        completed = []
+        text = self.text
+
+        while self._pos < len(text):
+            char = text[self._pos]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._state == "key":
+                        self._key = json.loads(text[self._start:self._pos + 1])
+                        self._state = "colon"
+                    elif self._state == "value" and self._depth == 0:
+                        completed.append(self._finish_value(self._pos + 1))
+                        continue
+                self._pos += 1
+                continue
+
+            if self._state == "scalar":
+                # Numbers and literals end at the next delimiter, which is then re-read
+                if char in ",}" or char in _WHITESPACE:
+                    completed.append(self._finish_value(self._pos))
+                    continue
+            elif self._state == "value":
+                if char == '"':
+                    self._in_string = True
+                elif char in "{[":
+                    self._depth += 1
+                elif char in "}]":
+                    self._depth -= 1
+                    if self._depth == 0:
+                        completed.append(self._finish_value(self._pos + 1))
+                        continue
+            elif char in _WHITESPACE:
+                pass
+            elif self._state == "open" and char == "{":
+                self._state = "key_or_end"
+            elif self._state in ("key_or_end", "key_start") and char == '"':
+                self._start = self._pos
+                self._in_string = True
+                self._state = "key"
+            elif self._state == "key_or_end" and char == "}":
+                self._state = "done"
+            elif self._state == "colon" and char == ":":
+                self._state = "value_start"
+            elif self._state == "value_start":
+                self._start = self._pos
+                if char == '"':
+                    self._in_string = True
+                    self._state = "value"
+                elif char in "{[":
+                    self._depth = 1
+                    self._state = "value"
+                else:
+                    self._state = "scalar"
+            elif self._state == "after_value" and char == ",":
+                self._state = "key_start"
+            elif self._state == "after_value" and char == "}":
+                self._state = "done"
+            else:
+                raise ValueError(f"Unexpected {char!r} at offset {self._pos} of streamed JSON")
+            self._pos += 1
+
+        return completed
+
+    def _finish_value(self, end: int) -> Tuple[str, Any]:
+        value = json.loads(self.text[self._start:end])
+        self.fields[self._key] = value
+        self._pos = end
+        self._state = "after_value"
+        return self._key, value
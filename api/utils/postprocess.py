@@ -1,12 +1,12 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import json
 from json.decoder import JSONDecodeError
 
 from fastapi import HTTPException
 from openai.types.chat import ChatCompletion
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Sequence
 
-from api.utils.constants import Priority, Category, PriorityResult, PriorityInference
+from api.utils.constants import Priority, Category, PriorityResult, PRIORITY_ENGINE
 
 
 def infer_priority(task_description: str, current_priority: str = "Unknown", ai_confidence: int = 0) -> PriorityResult:
@@ -30,9 +30,22 @@ def infer_priority(task_description: str, current_priority: str = "Unknown", ai_
         )
 
     # Case 2: Use regex-based inference as fallback
-    priority_model = PriorityInference()
-    inferred_priority, reasoning = priority_model.infer_priority(task_description)
+    inferred_priority, reasoning = PRIORITY_ENGINE.infer_priority(task_description)
+    return _regex_priority_result(inferred_priority, reasoning)
 
+
+def infer_priorities(task_descriptions: Sequence[str]) -> List[PriorityResult]:
+    """
+    Regex-based priority inference for a list of descriptions, sharing one
+    compiled engine across the whole batch.
+    """
+    return [
+        _regex_priority_result(inferred_priority, reasoning)
+        for inferred_priority, reasoning in PRIORITY_ENGINE.infer_priorities(task_descriptions)
+    ]
+
+
+def _regex_priority_result(inferred_priority: Priority, reasoning: Dict[str, Any]) -> PriorityResult:
     # Calculate confidence based on reasoning scores
     fallback_confidence = min(
         int((reasoning['final_score'] / 10) * 100),
@@ -69,10 +82,8 @@ def convert_to_valid_date(due_date_str: str) -> Optional[datetime]:
         return None
 
 
-def process_parsed_task(response: ChatCompletion, task_description: str) -> Dict[str, Any]:
-    """Process the OpenAI response, using its confidence score"""
-    # Validation code remains the same...
-
+def validate_parsed_task(response: ChatCompletion) -> Dict[str, Any]:
+    """Decodes and validates the OpenAI task parse; raises HTTPException if it is unusable"""
     try:
         parsed_task = json.loads(response.choices[0].message.content)
     except JSONDecodeError as e:
@@ -103,12 +114,28 @@ def process_parsed_task(response: ChatCompletion, task_description: str) -> Dict
             detail="Confidence score must be between 0 and 100"
         )
 
+    return parsed_task
+
+
+def process_parsed_task(
+        response: ChatCompletion,
+        task_description: str,
+        inferred_priority: Optional[PriorityResult] = None
+) -> Dict[str, Any]:
+    """
+    Process the OpenAI response, using its confidence score. `inferred_priority`
+    is the regex inference for the description if it was computed ahead of time.
+    """
+    parsed_task = validate_parsed_task(response)
+
     # Only infer priority if AI's confidence is low
     if parsed_task["confidence_score"] < 50:
-        inferred_priority = infer_priority(task_description, parsed_task.get("priority", "unknown"))
-        parsed_task["priority"] = inferred_priority
+        inferred_priority = inferred_priority or infer_priority(
+            task_description, parsed_task.get("priority", "unknown")
+        )
+        parsed_task["priority"] = inferred_priority.priority.value
         # Note in the response that priority was overridden
-        parsed_task["priority_source"] = "inferred"
+        parsed_task["priority_source"] = inferred_priority.source
     else:
         parsed_task["priority_source"] = "ai"
 
@@ -197,4 +224,33 @@ def parse_due_date(due_date: str) -> Optional[str]:
                 days_ahead = 7  # Move to next week
             return (today + timedelta(days=days_ahead)).date().isoformat()
 
-        return None
\ No newline at end of file
+        return None
+
+
+def process_search_query(parsed_query: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate the LLM's parsed search query into structured filters.
+    Unknown priorities/categories and unparseable dates are dropped rather than
+    applied, so a bad parse widens the search instead of emptying it.
+    """
+    priority = parsed_query.get("priority")
+    category = parsed_query.get("category")
+    search_terms = parsed_query.get("search_terms")
+    if isinstance(search_terms, list):
+        search_terms = " ".join(str(term) for term in search_terms)
+    return {
+        "search_terms": search_terms or None,
+        "priority": priority if priority in Priority._value2member_map_ and priority != Priority.UNKNOWN else None,
+        "category": category if category in Category._value2member_map_ else None,
+        "start_date": _parse_iso_date(parsed_query.get("due_after")),
+        "end_date": _parse_iso_date(parsed_query.get("due_before")),
+    }
+
+
+def _parse_iso_date(value: Any) -> Optional[date]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        return None
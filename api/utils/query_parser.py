@@ -0,0 +1,119 @@
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from api.utils.constants import Priority, Category, QUERY_FILLER_WORDS, SEARCH_KEYWORDS
+
+# Phrases that map directly to a priority, including a bare level ("high tasks")
+_PRIORITY_PATTERN = re.compile(
+    r"\b(?:(?P<level>high|medium|low)[- ]priority|priority[: ]+(?P<level_after>high|medium|low)"
+    r"|(?P<urgent>urgent)|(?P<bare>high|medium|low))\b"
+)
+
+# Category names, plus the adjective forms people type
+_CATEGORY_WORDS = {
+    **{category.value.lower(): category.value for category in Category if category != Category.OTHER},
+    "financial": Category.FINANCE.value,
+    "finances": Category.FINANCE.value,
+}
+_CATEGORY_PATTERN = re.compile(rf"\b({'|'.join(_CATEGORY_WORDS)})\b")
+
+_DATE_PATTERN = re.compile(
+    r"\b(?:due\s+)?(?P<phrase>today|tomorrow|this week|next week|this month|overdue)\b"
+)
+
+# Words that signal a constraint the rules above do not understand
+_AMBIGUOUS_PATTERN = re.compile(
+    r"\b(?:before|after|until|since|between|from|by|within|ago|last|not|without|except|or"
+    r"|january|february|march|april|may|june|july|august|september|october|november|december"
+    r"|monday|tuesday|wednesday|thursday|friday|saturday|sunday|weekend)\b|\d"
+)
+
+# Leftover words that still carry a priority or date constraint the rules did not extract
+_UNHANDLED_CUE_PATTERN = re.compile(
+    r"\b(?:important|critical|crucial|asap|urgently|pressing|top|minor|trivial|someday|whenever"
+    r"|soon|upcoming|later|recent|recently|yesterday|tonight|morning|afternoon|evening|eod|deadline"
+    r"|hours?|days?|weeks?|months?|quarter|year)\b"
+)
+
+# Leftover words that are not search terms once the filters are extracted
+_NOISE_WORDS = QUERY_FILLER_WORDS | SEARCH_KEYWORDS | {"due", "category", "in", "for", "the", "with", "are", "what"}
+
+# Confidence reported for queries the rules fully understood vs. ones they did not;
+# partly understood queries fall in between, by the share of words the rules consumed
+CONFIDENT = 0.95
+UNSURE = 0.3
+
+
+def parse_search_query_locally(query: str, today: Optional[date] = None) -> Tuple[Dict[str, Any], float]:
+    """
+    Deterministic parser for common search phrasings ("high priority work tasks",
+    "finance due this week"). Returns the same shape as LLMService.parse_search_query
+    plus a confidence; callers should fall back to the LLM when confidence is low.
+    Words left over as search terms lower the confidence, since they may hold
+    constraints the rules do not know.
+    """
+    today = today or date.today()
+    text = " ".join(query.lower().split())
+    word_count = len(text.split())
+
+    if _AMBIGUOUS_PATTERN.search(text):
+        return {}, UNSURE
+
+    priorities = {_priority_of(match) for match in _PRIORITY_PATTERN.finditer(text)}
+    if len(priorities) > 1:
+        # "high or low" style queries need the LLM
+        return {}, UNSURE
+    priority = priorities.pop() if priorities else None
+    text = _PRIORITY_PATTERN.sub(" ", text)
+
+    categories = {_CATEGORY_WORDS[word] for word in _CATEGORY_PATTERN.findall(text)}
+    if len(categories) > 1:
+        # "work or personal" style queries need the LLM
+        return {}, UNSURE
+    category = categories.pop() if categories else None
+    text = _CATEGORY_PATTERN.sub(" ", text)
+
+    due_after = due_before = None
+    phrases = {match.group("phrase") for match in _DATE_PATTERN.finditer(text)}
+    if len(phrases) > 1:
+        return {}, UNSURE
+    if phrases:
+        due_after, due_before = _date_range(phrases.pop(), today)
+        text = _DATE_PATTERN.sub(" ", text)
+
+    if _UNHANDLED_CUE_PATTERN.search(text):
+        return {}, UNSURE
+
+    leftover = [word for word in text.split() if word not in _NOISE_WORDS]
+    consumed_share = 1 - len(leftover) / word_count if word_count else 1.0
+    return {
+        "search_terms": " ".join(leftover) or None,
+        "priority": priority,
+        "category": category,
+        "due_after": due_after.isoformat() if due_after else None,
+        "due_before": due_before.isoformat() if due_before else None,
+    }, UNSURE + (CONFIDENT - UNSURE) * consumed_share
+
+
+def _priority_of(match: re.Match) -> str:
+    level = match.group("level") or match.group("level_after") or match.group("bare")
+    return Priority(level.title()).value if level else Priority.HIGH.value
+
+
+def _date_range(phrase: str, today: date) -> Tuple[Optional[date], Optional[date]]:
+    """Inclusive (due_after, due_before) range for a relative date phrase"""
+    if phrase == "today":
+        return today, today
+    if phrase == "tomorrow":
+        return today + timedelta(days=1), today + timedelta(days=1)
+    if phrase == "overdue":
+        return None, today - timedelta(days=1)
+    if phrase == "this month":
+        next_month = (today.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return today.replace(day=1), next_month - timedelta(days=1)
+
+    monday = today - timedelta(days=today.weekday())
+    if phrase == "next week":
+        monday += timedelta(days=7)
+    return monday, monday + timedelta(days=6)
@@ -0,0 +1,25 @@
+from typing import Dict, List, Sequence, Tuple, Hashable
+
+# Standard RRF constant; dampens the advantage of the very top ranks
+DEFAULT_RRF_K = 60
+
+
+def reciprocal_rank_fusion(
+        rankings: Sequence[Tuple[Sequence[Hashable], float]],
+        k: int = DEFAULT_RRF_K
+) -> List[Tuple[Hashable, float]]:
+    """
+    Merges ranked id lists with weighted reciprocal rank fusion.
+
+    Args:
+        rankings: (ids best-first, weight) for each result list
+        k: rank offset; larger values flatten the differences between ranks
+
+    Returns:
+        (id, fused score) pairs, highest score first
+    """
+    scores: Dict[Hashable, float] = {}
+    for ids, weight in rankings:
+        for rank, item_id in enumerate(ids, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
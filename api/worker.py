@@ -0,0 +1,34 @@
+"""
+Celery worker for background indexing (Settings.INDEXING_MODE = "celery").
+
+Run with:
+    celery -A api.worker worker --loglevel=INFO
+"""
+import asyncio
+
+from celery import Celery
+
+from api.config import get_settings
+from api.services.embedding_service import EmbeddingService
+from api.services.indexing_queue import IndexingQueue, retry_delay
+
+settings = get_settings()
+
+celery_app = Celery("taskagent", broker=settings.CELERY_BROKER_URL)
+
+# One event loop per worker process, so the async engine's pooled
+# connections stay bound to the loop that created them
+_loop = asyncio.new_event_loop()
+_indexer = IndexingQueue(EmbeddingService(), mode="inline")
+
+
+@celery_app.task(bind=True, max_retries=settings.INDEXING_MAX_RETRIES, acks_late=True)
+def index_task(self, task_id: int) -> None:
+    """Embeds a task and adds it to the vector store, retrying with backoff"""
+    try:
+        _loop.run_until_complete(_indexer.index_once(task_id))
+    except Exception as e:
+        if self.request.retries >= self.max_retries:
+            _loop.run_until_complete(_indexer.mark_failed(task_id))
+            raise
+        raise self.retry(exc=e, countdown=retry_delay(settings.INDEXING_RETRY_BASE_DELAY, self.request.retries))
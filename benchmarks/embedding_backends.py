@@ -0,0 +1,97 @@
+"""
+Latency and throughput of the remote (OpenAI, via the stub) and local
+(sentence-transformers) embedding backends.
+
+Latency is one text per call, one call at a time, as a search request sees it;
+throughput embeds --texts texts in --batch-size batches with --concurrency
+batches in flight. The stub's --latency-ms stands in for the WAN round trip.
+The local backend needs requirements-local.txt (sentence-transformers) installed.
+
+Usage:
+    python -m benchmarks.embedding_backends --texts 2000 --batch-size 64 --latency-ms 150
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+PORT = 9102
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Embedding backend benchmark")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-samples", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--local-model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--local-dimension", type=int, default=384)
+    parser.add_argument("--local-workers", type=int, default=2)
+    return parser.parse_args()
+
+
+async def measure_latency(backend, samples: int) -> list:
+    """Milliseconds per single-text embed() call"""
+    timings = []
+    for i in range(samples):
+        start = time.perf_counter()
+        await backend.embed([f"find the tax documents for invoice {i}"])
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def measure_throughput(backend, texts: int, batch_size: int, concurrency: int) -> float:
+    """Texts embedded per second"""
+    gate = asyncio.Semaphore(concurrency)
+    batches = [
+        [f"Submit quarterly report #{i} by Friday" for i in range(start, min(start + batch_size, texts))]
+        for start in range(0, texts, batch_size)
+    ]
+
+    async def one(batch):
+        async with gate:
+            await backend.embed(batch)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(batch) for batch in batches))
+    return texts / (time.perf_counter() - start)
+
+
+async def main():
+    args = parse_args()
+    os.environ["STUB_LATENCY_MS"] = str(args.latency_ms)
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{PORT}/v1"
+
+    # Imported after the environment is set so settings pick up the stub
+    from benchmarks.openai_stub import start_stub_server
+    from api.services.embedding_backends import OpenAIEmbeddingBackend, LocalEmbeddingBackend
+
+    start_stub_server(PORT)
+
+    backends = [("remote (stub)", OpenAIEmbeddingBackend(model="text-embedding-ada-002", dimension=1536))]
+    try:
+        import sentence_transformers  # noqa: F401
+        local = LocalEmbeddingBackend(model=args.local_model, dimension=args.local_dimension,
+                                      workers=args.local_workers)
+        # Load the model in every worker before timing
+        await asyncio.gather(*(local.embed(["warm up"]) for _ in range(args.local_workers)))
+        backends.append((f"local ({args.local_workers} procs)", local))
+    except ImportError:
+        print("sentence-transformers is not installed; skipping the local backend")
+
+    print(f"{args.texts} texts, batch size {args.batch_size}, {args.concurrency} batches in flight, "
+          f"stub latency {args.latency_ms}ms")
+    for label, backend in backends:
+        timings = sorted(await measure_latency(backend, args.latency_samples))
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        throughput = await measure_throughput(backend, args.texts, args.batch_size, args.concurrency)
+        print(f"{label:<18} p50 {statistics.median(timings):7.1f}ms  p95 {p95:7.1f}ms  "
+              f"{throughput:9.1f} texts/s")
+        await backend.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
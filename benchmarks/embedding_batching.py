@@ -0,0 +1,73 @@
+"""
+Embedding throughput under concurrent single-text requests, with and without
+micro-batching in EmbeddingService.
+
+"unbatched" sets the batch size to 1, so every caller sends its own
+embeddings request; "batched" uses the configured window and batch size.
+
+Usage:
+    python -m benchmarks.embedding_batching --requests 1000 --concurrency 200 --latency-ms 100
+"""
+import argparse
+import asyncio
+import os
+import time
+
+PORT = 9101
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Embedding micro-batching benchmark")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--window-ms", type=float, default=5)
+    parser.add_argument("--max-batch", type=int, default=256)
+    return parser.parse_args()
+
+
+async def run_workload(service, label: str, total: int, concurrency: int) -> float:
+    """Embeds `total` distinct texts with at most `concurrency` in flight; returns elapsed seconds"""
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with gate:
+            # Distinct texts per run so the embedding cache never answers
+            await service.generate_embedding(f"{label} task #{i}: review the quarterly budget")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return time.perf_counter() - start
+
+
+async def main():
+    args = parse_args()
+    os.environ["STUB_LATENCY_MS"] = str(args.latency_ms)
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{PORT}/v1"
+    os.environ["EMBEDDING_BATCH_WINDOW_MS"] = str(args.window_ms)
+    os.environ["EMBEDDING_BATCH_MAX_SIZE"] = str(args.max_batch)
+
+    # Imported after the environment is set so settings pick up the stub
+    from benchmarks.openai_stub import start_stub_server
+    from api.services.embedding_service import EmbeddingService
+    from api.utils.metrics import EMBEDDING_API_CALLS
+
+    start_stub_server(PORT)
+
+    unbatched = EmbeddingService()
+    unbatched.batch_max_size = 1
+    batched = EmbeddingService()
+
+    print(f"{args.requests} embeddings, concurrency {args.concurrency}, stub latency {args.latency_ms}ms, "
+          f"window {args.window_ms}ms, max batch {args.max_batch}")
+    for label, service in [("unbatched", unbatched), ("batched", batched)]:
+        calls_before = EMBEDDING_API_CALLS.value(source="embedding_service")
+        elapsed = await run_workload(service, label, args.requests, args.concurrency)
+        calls = EMBEDDING_API_CALLS.value(source="embedding_service") - calls_before
+        print(f"{label:<10} {elapsed:8.2f}s  {args.requests / elapsed:8.1f} embeddings/s  "
+              f"{calls:6.0f} API calls  {args.requests / calls:6.1f} inputs/call")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
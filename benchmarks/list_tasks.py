@@ -0,0 +1,85 @@
+"""
+Rows/sec of the list read path with and without the embedding column.
+
+Reads through TaskRepository.get_page and validates into TaskOutput, like
+GET /tasks, once with the embedding undeferred (the old `select(Task)`
+behaviour) and once with the default projection.
+
+Runs against the database configured in Settings. Use --seed to insert
+synthetic tasks with random embeddings first.
+
+Usage:
+    python -m benchmarks.list_tasks --seed 20000 --page-size 1000
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import numpy as np
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="List read-path benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="Insert this many synthetic tasks first")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=3)
+    return parser.parse_args()
+
+
+async def seed(count: int):
+    from api.database import SessionLocal
+    from api.repositories.task_repository import TaskRepository
+
+    rng = np.random.default_rng(0)
+    async with SessionLocal() as db:
+        repository = TaskRepository(db)
+        for start in range(0, count, 1000):
+            await repository.create_many([
+                {
+                    "name": f"Benchmark task {i}",
+                    "priority": "Medium",
+                    "category": "Work",
+                    "embedding": rng.standard_normal(1536).tolist()
+                }
+                for i in range(start, min(start + 1000, count))
+            ])
+
+
+async def read_all(page_size: int, include_embedding: bool) -> int:
+    """Pages through the whole table; returns the number of rows read"""
+    from api.database import SessionLocal
+    from api.models.schemas import TaskOutput
+    from api.repositories.task_repository import TaskRepository
+
+    rows, after = 0, None
+    async with SessionLocal() as db:
+        repository = TaskRepository(db)
+        while True:
+            tasks = await repository.get_page(limit=page_size, after=after, include_embedding=include_embedding)
+            if not tasks:
+                return rows
+            [TaskOutput.model_validate(task) for task in tasks]
+            rows += len(tasks)
+            after = (tasks[-1].due_date, tasks[-1].id)
+
+
+async def main():
+    args = parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+    if args.seed:
+        print(f"Seeding {args.seed} tasks...")
+        await seed(args.seed)
+
+    for label, include_embedding in [("before (with embedding)", True), ("after (projected)", False)]:
+        best = 0.0
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            rows = await read_all(args.page_size, include_embedding)
+            best = max(best, rows / (time.perf_counter() - start))
+        print(f"{label:<24} {best:10.0f} rows/s  ({rows} rows)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""
+Concurrent-create throughput of the LLM parsing step, before and after the
+async client.
+
+"before" calls the synchronous OpenAI client from inside a coroutine, the way
+POST /tasks used to, so each completion blocks the event loop. "after" goes
+through LLMService on the shared AsyncOpenAI pool.
+
+Usage:
+    python -m benchmarks.llm_concurrency --requests 200 --concurrency 50 --latency-ms 200
+"""
+import argparse
+import asyncio
+import os
+import time
+
+PORT = 9100
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="LLM concurrency benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    return parser.parse_args()
+
+
+async def run_workload(create, total: int, concurrency: int) -> float:
+    """Runs `total` creates with at most `concurrency` in flight; returns elapsed seconds"""
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with gate:
+            await create(f"Submit quarterly report #{i} by Friday")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return time.perf_counter() - start
+
+
+async def main():
+    args = parse_args()
+    os.environ["STUB_LATENCY_MS"] = str(args.latency_ms)
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{PORT}/v1"
+
+    # Imported after the environment is set so settings pick up the stub
+    from openai import OpenAI
+    from benchmarks.openai_stub import start_stub_server
+    from api.services.llm_service import LLMService
+    from api.utils.postprocess import process_parsed_task
+
+    start_stub_server(PORT)
+
+    sync_client = OpenAI(base_url=os.environ["OPENAI_BASE_URL"])
+
+    async def create_before(description: str):
+        response = sync_client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            max_tokens=100,
+            messages=[{"role": "user", "content": description}]
+        )
+        process_parsed_task(response, description)
+
+    llm_service = LLMService(max_concurrency=args.concurrency)
+
+    async def create_after(description: str):
+        response = await llm_service.parse_task_description(description)
+        process_parsed_task(response, description)
+
+    print(f"{args.requests} creates, concurrency {args.concurrency}, stub latency {args.latency_ms}ms")
+    for label, create in [("before (sync client)", create_before), ("after (async client)", create_after)]:
+        elapsed = await run_workload(create, args.requests, args.concurrency)
+        print(f"{label:<22} {elapsed:8.2f}s  {args.requests / elapsed:8.1f} creates/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,319 @@
+"""
+End-to-end load test of the HTTP API against a deterministic OpenAI stub.
+
+Boots benchmarks.openai_stub and the API (uvicorn api.main:app) as
+subprocesses, with the API pointed at the stub through OPENAI_BASE_URL and
+at the Postgres + pgvector database configured in Settings (migrated to
+head, e.g. the docker-compose `postgres` service). It then drives the create,
+list, search and update workloads over HTTP at each concurrency level and
+reports throughput and p50/p95/p99 latency.
+
+Results are written as JSON to --output. Pass an earlier run's file as
+--baseline to compare: the script exits non-zero if any workload's
+throughput drops, or its p95 rises, by more than --tolerance, so it can gate
+CI next to the pytest suite.
+
+Task descriptions are read from --seed-file, a JSON-lines file whose records
+have a "description" field (or "title" and "body", as in requests.jsonl), or
+taken from a built-in set. Tasks created by the run are deleted at the end.
+
+Usage:
+    alembic upgrade head
+    python -m benchmarks.load_test --concurrency 1,10,50 --requests 500 --latency-ms 200
+    python -m benchmarks.load_test --output after.json --baseline before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+STUB_PORT = 9200
+APP_PORT = 9210
+
+WORKLOADS = ("create", "list", "search", "update")
+
+DEFAULT_DESCRIPTIONS = [
+    "Submit the quarterly report to finance by Friday",
+    "Call the dentist to reschedule next week's appointment",
+    "Review the pull request for the billing service today",
+    "Renew the car insurance before the end of the month",
+    "Prepare slides for Monday's team meeting",
+    "Pay the electricity bill",
+    "Book flights for the conference in June",
+    "Urgent: fix the production login outage",
+    "Buy groceries for the weekend",
+    "Schedule a one-on-one with the new hire",
+]
+
+PRIORITIES = ("Low", "Medium", "High")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="HTTP load test against a local OpenAI stub")
+    parser.add_argument("--concurrency", default="1,10,50", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per workload and level")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help="Comma-separated subset of workloads")
+    parser.add_argument("--latency-ms", type=float, default=200, help="Stub latency per OpenAI call")
+    parser.add_argument("--seed-file", help="JSON lines with task descriptions")
+    parser.add_argument("--app-workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--app-url", help="Load an already running API instead of booting one")
+    parser.add_argument("--output", default=f"load_test_{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json")
+    parser.add_argument("--baseline", help="Results file of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression")
+    args = parser.parse_args()
+    args.concurrency = [int(level) for level in args.concurrency.split(",")]
+    args.workloads = [name for name in args.workloads.split(",") if name]
+    unknown = set(args.workloads) - set(WORKLOADS)
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+    return args
+
+
+def load_descriptions(path: Optional[str]) -> List[str]:
+    """Task descriptions from a JSON-lines file, or the built-in set"""
+    if not path:
+        return DEFAULT_DESCRIPTIONS
+    descriptions = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            description = record.get("description") or record.get("title") or record.get("body")
+            if description:
+                descriptions.append(description)
+    if not descriptions:
+        raise SystemExit(f"No task descriptions found in {path}")
+    return descriptions
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    """Polls `url` until the server answers (any status) or the process exits"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server for {url} exited with status {process.returncode}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server for {url} did not start within {timeout:.0f}s")
+
+
+@contextmanager
+def serve(app: str, port: int, env: Dict[str, str], workers: int = 1):
+    """Runs `uvicorn app` in a subprocess for the duration of the block"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        env={**os.environ, **env}
+    )
+    try:
+        wait_until_up(f"http://127.0.0.1:{port}/", process)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+@dataclass
+class WorkloadResult:
+    workload: str
+    concurrency: int
+    elapsed: float = 0.0
+    errors: int = 0
+    latencies: List[float] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        latencies = np.array(self.latencies or [0.0]) * 1000
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        return {
+            "workload": self.workload,
+            "concurrency": self.concurrency,
+            "requests": len(self.latencies) + self.errors,
+            "errors": self.errors,
+            "throughput": len(self.latencies) / self.elapsed if self.elapsed else 0.0,
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+        }
+
+
+async def run_workload(
+        name: str,
+        send: Callable[[int], Awaitable[httpx.Response]],
+        total: int,
+        concurrency: int
+) -> WorkloadResult:
+    """Sends `total` requests with at most `concurrency` in flight, timing each"""
+    result = WorkloadResult(name, concurrency)
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with gate:
+            start = time.perf_counter()
+            try:
+                response = await send(i)
+                response.raise_for_status()
+            except httpx.HTTPError:
+                result.errors += 1
+                return
+            result.latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+async def drive(base_url: str, args, descriptions: List[str]) -> List[dict]:
+    """Runs every workload at every concurrency level; returns their summaries"""
+    created: List[int] = []
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client:
+        run = 0
+
+        async def create(i: int) -> httpx.Response:
+            # Numbered so each create is a parse-cache miss, like distinct user input
+            description = f"{descriptions[i % len(descriptions)]} (#{run}-{i})"
+            response = await client.post("/tasks/", json={"description": description})
+            if response.status_code == 200:
+                created.append(response.json()["id"])
+            return response
+
+        async def list_page(i: int) -> httpx.Response:
+            return await client.get("/tasks/", params={"limit": 100})
+
+        async def search(i: int) -> httpx.Response:
+            return await client.get("/tasks/search", params={"query": descriptions[i % len(descriptions)]})
+
+        async def update(i: int) -> httpx.Response:
+            task_id = created[i % len(created)]
+            return await client.put(f"/tasks/{task_id}", json={"priority": PRIORITIES[i % len(PRIORITIES)]})
+
+        senders = {"create": create, "list": list_page, "search": search, "update": update}
+
+        if "update" in args.workloads and "create" not in args.workloads:
+            # Updates need existing tasks; seeding is not measured
+            await run_workload("seed", create, max(args.concurrency), max(args.concurrency))
+            run += 1
+
+        summaries = []
+        try:
+            for concurrency in args.concurrency:
+                for name in args.workloads:
+                    if name == "update" and not created:
+                        print(f"update  c={concurrency:<4} skipped: no tasks were created")
+                        continue
+                    result = await run_workload(name, senders[name], args.requests, concurrency)
+                    summaries.append(result.summary())
+                    print_row(summaries[-1])
+                    run += 1
+        finally:
+            gate = asyncio.Semaphore(max(args.concurrency))
+
+            async def delete(task_id: int):
+                async with gate:
+                    await client.delete(f"/tasks/{task_id}")
+
+            await asyncio.gather(*(delete(task_id) for task_id in created), return_exceptions=True)
+    return summaries
+
+
+def print_row(summary: dict) -> None:
+    print(f"{summary['workload']:<7} c={summary['concurrency']:<4} {summary['throughput']:8.1f} req/s  "
+          f"p50 {summary['p50_ms']:8.1f}ms  p95 {summary['p95_ms']:8.1f}ms  p99 {summary['p99_ms']:8.1f}ms  "
+          f"errors {summary['errors']}")
+
+
+def compare(summaries: List[dict], baseline_path: str, tolerance: float) -> bool:
+    """Prints changes against the baseline; returns False if anything regressed beyond tolerance"""
+    with open(baseline_path) as f:
+        baseline = {(s["workload"], s["concurrency"]): s for s in json.load(f)["results"]}
+
+    ok = True
+    print(f"\nCompared with {baseline_path} (tolerance {tolerance:.0%})")
+    for summary in summaries:
+        before = baseline.get((summary["workload"], summary["concurrency"]))
+        if before is None:
+            continue
+        throughput = summary["throughput"] / before["throughput"] - 1 if before["throughput"] else 0.0
+        p95 = summary["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        regressed = throughput < -tolerance or p95 > tolerance or summary["errors"] > before["errors"]
+        ok &= not regressed
+        print(f"{summary['workload']:<7} c={summary['concurrency']:<4} throughput {throughput:+7.1%}  "
+              f"p95 {p95:+7.1%}  {'REGRESSED' if regressed else 'ok'}")
+    return ok
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> int:
+    args = parse_args()
+    descriptions = load_descriptions(args.seed_file)
+
+    stub_env = {
+        "STUB_LATENCY_MS": str(args.latency_ms),
+        "STUB_EMBEDDING_DIMENSION": os.getenv("EMBEDDING_DIMENSION", "1536"),
+    }
+    app_env = {
+        "OPENAI_API_KEY": "stub",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{STUB_PORT}/v1",
+        "EMBEDDING_BACKEND": "openai",
+        "LOG_LEVEL": "WARNING",
+    }
+
+    print(f"{args.requests} requests per workload, stub latency {args.latency_ms}ms, "
+          f"{len(descriptions)} task descriptions")
+    if args.app_url:
+        summaries = asyncio.run(drive(args.app_url, args, descriptions))
+    else:
+        with serve("benchmarks.openai_stub:app", STUB_PORT, stub_env), \
+                serve("api.main:app", APP_PORT, app_env, workers=args.app_workers) as app_url:
+            summaries = asyncio.run(drive(app_url, args, descriptions))
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "requests": args.requests,
+                "latency_ms": args.latency_ms,
+                "app_workers": args.app_workers,
+                "app_url": args.app_url,
+            },
+            "results": summaries,
+        }, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline and not compare(summaries, args.baseline, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
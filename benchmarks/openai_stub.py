@@ -0,0 +1,131 @@
+"""
+Deterministic stand-in for the OpenAI API used by the benchmarks.
+
+Serves /v1/chat/completions and /v1/embeddings with a fixed, configurable
+latency so throughput numbers measure our code rather than OpenAI. Streamed
+completions spread the latency over a few chunks, like tokens arriving.
+
+Run standalone:
+    STUB_LATENCY_MS=200 uvicorn benchmarks.openai_stub:app --port 9000
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+app = FastAPI()
+
+LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "200"))
+# Share of LATENCY_MS spent before the first streamed chunk
+FIRST_CHUNK_SHARE = 0.5
+STREAM_CHUNK_CHARS = 8
+EMBEDDING_DIMENSION = int(os.getenv("STUB_EMBEDDING_DIMENSION", "1536"))
+
+# The name is replaced with the task description (see task_response)
+TASK_RESPONSE = {
+    "name": "Submit quarterly report",
+    "due_date": "2025-04-15",
+    "priority": "High",
+    "category": "Work",
+    "confidence_score": 90
+}
+
+SEARCH_RESPONSE = {
+    "search_terms": "report",
+    "priority": None,
+    "category": None
+}
+
+
+def fake_embedding(text: str, dimension: int = EMBEDDING_DIMENSION) -> list:
+    """Unit vector seeded from the text, so equal inputs embed identically"""
+    seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimension)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def task_response(body: dict) -> dict:
+    """
+    TASK_RESPONSE named after the description being parsed, so distinct inputs
+    get distinct names, and therefore embedding-cache misses, as real parses do
+    """
+    user_message = body["messages"][-1]["content"]
+    match = re.search(r"Task Description:\s*(.+)", user_message)
+    description = (match.group(1) if match else user_message).strip()
+    return {**TASK_RESPONSE, "name": description[:200] or TASK_RESPONSE["name"]}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    system_prompt = body["messages"][0]["content"]
+    content = SEARCH_RESPONSE if "search parameters" in system_prompt else task_response(body)
+    if body.get("stream"):
+        await asyncio.sleep(LATENCY_MS * FIRST_CHUNK_SHARE / 1000)
+        return StreamingResponse(stream_completion(body, json.dumps(content)), media_type="text/event-stream")
+
+    await asyncio.sleep(LATENCY_MS / 1000)
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": json.dumps(content)},
+            "finish_reason": "stop"
+        }],
+        "usage": {"prompt_tokens": 50, "completion_tokens": 30, "total_tokens": 80}
+    }
+
+
+async def stream_completion(body: dict, content: str):
+    """Server-sent chat.completion.chunk events, ending with a usage chunk and [DONE]"""
+    pieces = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)]
+    delay = LATENCY_MS * (1 - FIRST_CHUNK_SHARE) / 1000 / len(pieces)
+    base = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+            "model": body.get("model", "stub")}
+
+    for i, piece in enumerate(pieces):
+        await asyncio.sleep(delay)
+        finish_reason = "stop" if i == len(pieces) - 1 else None
+        chunk = {**base, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": finish_reason}]}
+        yield f"data: {json.dumps(chunk)}\n\n"
+    if (body.get("stream_options") or {}).get("include_usage"):
+        usage = {"prompt_tokens": 50, "completion_tokens": 30, "total_tokens": 80}
+        yield f"data: {json.dumps({**base, 'choices': [], 'usage': usage})}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    await asyncio.sleep(LATENCY_MS / 1000)
+
+    inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+    return {
+        "object": "list",
+        "data": [
+            {"object": "embedding", "index": i, "embedding": fake_embedding(text)}
+            for i, text in enumerate(inputs)
+        ],
+        "model": body.get("model", "stub"),
+        "usage": {"prompt_tokens": len(inputs), "total_tokens": len(inputs)}
+    }
+
+
+def start_stub_server(port: int = 9000) -> uvicorn.Server:
+    """Starts the stub on a background thread and waits until it accepts requests"""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
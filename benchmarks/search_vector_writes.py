@@ -0,0 +1,108 @@
+"""
+Write throughput with the old and the consolidated search_vector maintenance.
+
+Builds two temporary copies of the searchable part of `tasks`:
+- before: both BEFORE INSERT OR UPDATE triggers and both GIN indexes
+- after:  one weighted trigger that fires on insert and on name/category/priority
+          changes, and a single GIN index
+
+and times a bulk INSERT, a status-only UPDATE (what the embedding indexer does)
+and a name UPDATE on each. Runs against the database configured in Settings
+after the consolidate_search_vector_maintenance migration; the temporary tables
+disappear with the connection.
+
+Usage:
+    python -m benchmarks.search_vector_writes --rows 50000
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+TABLE = """
+    CREATE TEMP TABLE {table} (
+        id serial PRIMARY KEY,
+        name text NOT NULL,
+        category text,
+        priority text,
+        embedding_status text NOT NULL DEFAULT 'pending',
+        search_vector tsvector
+    )
+"""
+
+SETUP = {
+    "before": [
+        "CREATE INDEX ON {table} USING gin (search_vector)",
+        "CREATE INDEX ON {table} USING gin (search_vector)",
+        """CREATE TRIGGER {table}_weighted BEFORE INSERT OR UPDATE ON {table}
+           FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update()""",
+        """CREATE TRIGGER {table}_unweighted BEFORE INSERT OR UPDATE ON {table}
+           FOR EACH ROW EXECUTE FUNCTION
+           tsvector_update_trigger(search_vector, 'pg_catalog.english', name, category, priority)""",
+    ],
+    "after": [
+        "CREATE INDEX ON {table} USING gin (search_vector)",
+        """CREATE TRIGGER {table}_on_insert BEFORE INSERT ON {table}
+           FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update()""",
+        """CREATE TRIGGER {table}_on_update BEFORE UPDATE OF name, category, priority ON {table}
+           FOR EACH ROW
+           WHEN (OLD.name IS DISTINCT FROM NEW.name
+                 OR OLD.category IS DISTINCT FROM NEW.category
+                 OR OLD.priority IS DISTINCT FROM NEW.priority)
+           EXECUTE FUNCTION tasks_search_vector_update()""",
+    ],
+}
+
+WORKLOAD = [
+    ("insert", """INSERT INTO {table} (name, category, priority)
+                  SELECT 'Review quarterly budget report ' || g, 'Work', 'High'
+                  FROM generate_series(1, :rows) g"""),
+    ("status update", "UPDATE {table} SET embedding_status = 'ready'"),
+    ("name update", "UPDATE {table} SET name = name || ' (revised)'"),
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="search_vector write benchmark")
+    parser.add_argument("--rows", type=int, default=50000)
+    return parser.parse_args()
+
+
+async def run(conn, variant: str, rows: int) -> dict:
+    """Seconds per workload step for one variant"""
+    table = f"bench_tasks_{variant}"
+    await conn.execute(text(TABLE.format(table=table)))
+    for statement in SETUP[variant]:
+        await conn.execute(text(statement.format(table=table)))
+    await conn.commit()
+
+    timings = {}
+    for step, statement in WORKLOAD:
+        start = time.perf_counter()
+        await conn.execute(text(statement.format(table=table)), {"rows": rows})
+        await conn.commit()
+        timings[step] = time.perf_counter() - start
+    return timings
+
+
+async def main():
+    args = parse_args()
+    from api.database import engine
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SET statement_timeout = 0"))
+        results = {variant: await run(conn, variant, args.rows) for variant in ("before", "after")}
+        await conn.execute(text("RESET statement_timeout"))
+        await conn.commit()
+    await engine.dispose()
+
+    print(f"{args.rows} rows")
+    for step, _ in WORKLOAD:
+        before, after = results["before"][step], results["after"][step]
+        print(f"{step:<14} before {args.rows / before:10.0f} rows/s  after {args.rows / after:10.0f} rows/s  "
+              f"({before / after:4.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+"""
+Encode/decode cost of 10k embeddings: the previous text format versus the
+pgvector binary codec registered on asyncpg connections.
+
+Usage:
+    python -m benchmarks.vector_codec --vectors 10000 --dimension 1536
+"""
+import argparse
+import time
+
+import numpy as np
+from pgvector.utils import Vector
+
+
+def encode_text(value) -> str:
+    """Previous bind_processor: list -> '[x,y,...]'"""
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    return f"[{','.join(str(x) for x in value)}]"
+
+
+def decode_text(value: str) -> list:
+    """Previous result_processor: '[x,y,...]' -> list of floats"""
+    return [float(x) for x in value[1:-1].split(',')]
+
+
+def encode_binary(value) -> bytes:
+    """pgvector's binary codec, as registered on asyncpg connections"""
+    return Vector(value).to_binary()
+
+
+def decode_binary(value: bytes) -> np.ndarray:
+    return Vector.from_binary(value).to_numpy().astype(np.float32)
+
+
+def timed(label: str, fn, items) -> list:
+    start = time.perf_counter()
+    out = [fn(item) for item in items]
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms  {elapsed / len(items) * 1e6:8.1f} us/vector")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector codec microbenchmark")
+    parser.add_argument("--vectors", type=int, default=10000)
+    parser.add_argument("--dimension", type=int, default=1536)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    arrays = list(rng.standard_normal((args.vectors, args.dimension), dtype=np.float32))
+    lists = [array.tolist() for array in arrays]
+
+    print(f"{args.vectors} vectors x {args.dimension} dims")
+    texts = timed("text encode (list)", encode_text, lists)
+    timed("text encode (ndarray)", encode_text, arrays)
+    timed("text decode", decode_text, texts)
+    timed("binary encode (list)", encode_binary, lists)
+    payloads = timed("binary encode (ndarray)", encode_binary, arrays)
+    decoded = timed("binary decode", decode_binary, payloads)
+
+    assert np.array_equal(decoded[0], arrays[0])
+
+
+if __name__ == "__main__":
+    main()
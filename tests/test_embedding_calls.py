@@ -0,0 +1,79 @@
+"""
+One embedding API call per created task: save_task embeds the task once and
+hands the vector to Chroma instead of letting Chroma embed the text again.
+Runs without a database or OpenAI; both are replaced by fakes.
+"""
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from api.repositories import vector_store
+from api.services import embedding_service
+from api.services.embedding_backends import OpenAIEmbeddingBackend
+from api.utils.metrics import EMBEDDING_API_CALLS
+
+DIMENSION = 8
+
+
+class FakeEmbeddingsAPI:
+    """client.embeddings for OpenAIEmbeddingBackend, answering without a network call"""
+
+    async def create(self, input, model):
+        return SimpleNamespace(
+            data=[SimpleNamespace(index=i, embedding=[0.25] * DIMENSION) for i in range(len(input))],
+            usage=SimpleNamespace(prompt_tokens=len(input), completion_tokens=0)
+        )
+
+
+class FakeTextEmbeddings:
+    def embed_documents(self, texts):
+        return [[0.25] * DIMENSION for _ in texts]
+
+    def embed_query(self, text):
+        return [0.25] * DIMENSION
+
+
+class FakeChroma:
+    """Chroma store whose own embedding calls are counted, like the real one's"""
+
+    def __init__(self):
+        self.embedding_function = vector_store.CountingEmbeddings(FakeTextEmbeddings())
+        self.upserts = []
+        self._collection = SimpleNamespace(upsert=lambda **kwargs: self.upserts.append(kwargs))
+
+    def add_documents(self, docs):
+        self.embedding_function.embed_documents([doc.page_content for doc in docs])
+
+
+class FakeRepository:
+    def __init__(self, db):
+        pass
+
+    async def create(self, values):
+        return SimpleNamespace(id=1, created_at=datetime.now(), **values)
+
+
+class FakeSession:
+    async def rollback(self):
+        pass
+
+
+def embedding_calls() -> float:
+    return EMBEDDING_API_CALLS.value(source="embedding_service") + EMBEDDING_API_CALLS.value(source="chroma")
+
+
+def test_save_task_makes_one_embedding_call(monkeypatch):
+    chroma = FakeChroma()
+    monkeypatch.setattr(vector_store, "get_vector_store", lambda: chroma)
+    monkeypatch.setattr(embedding_service, "TaskRepository", FakeRepository)
+
+    backend = OpenAIEmbeddingBackend("test-model", DIMENSION, client=SimpleNamespace(embeddings=FakeEmbeddingsAPI()))
+    service = embedding_service.EmbeddingService(backend=backend)
+    service.index_in_chroma = True
+
+    before = embedding_calls()
+    asyncio.run(service.save_task(FakeSession(), {"name": "Renew passport", "priority": "High", "category": "Personal"}))
+
+    assert embedding_calls() - before == 1
+    # Chroma stored the vector it was given
+    assert chroma.upserts and chroma.upserts[0]["embeddings"] == [[0.25] * DIMENSION]
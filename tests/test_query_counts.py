@@ -0,0 +1,123 @@
+"""
+Statements and commits per write path, asserted against a budget.
+
+Drives the repository the way the routes do (a get_db session per request)
+and counts what reaches the database through SQLAlchemy engine events. Each
+write path should be one statement plus one commit.
+
+Runs against the database configured in Settings and removes the task it
+creates; skipped when no database is reachable, except in CI, where the
+workflow provides one and an unreachable database fails the run.
+"""
+import asyncio
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import pytest
+from sqlalchemy import event
+
+# (statements, commits) allowed per operation
+BUDGETS = {
+    "create": (1, 1),
+    "update": (1, 1),
+    "get": (1, 1),
+    "delete": (1, 1),
+}
+
+
+@dataclass
+class QueryCount:
+    statements: int = 0
+    commits: int = 0
+
+
+@contextmanager
+def count_queries(engine):
+    """Counts statements and commits issued on `engine` inside the block"""
+    count = QueryCount()
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        count.statements += 1
+
+    def on_commit(conn):
+        count.commits += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    event.listen(engine.sync_engine, "commit", on_commit)
+    try:
+        yield count
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+        event.remove(engine.sync_engine, "commit", on_commit)
+
+
+async def request(operation):
+    """Runs `operation(db)` inside a request-scoped session, like a route with Depends(get_db)"""
+    from api.database import get_db
+
+    sessions = get_db()
+    db = await sessions.__anext__()
+    result = await operation(db)
+    # Finishing the generator runs get_db's commit and close, as FastAPI does after the response
+    await sessions.aclose()
+    return result
+
+
+@pytest.fixture(scope="module")
+def engine():
+    """The app's engine, or a skip (a failure in CI) when its database is not reachable"""
+    from api.database import engine
+
+    async def ping():
+        try:
+            async with engine.connect():
+                pass
+        finally:
+            # Pooled connections belong to this event loop
+            await engine.dispose()
+
+    try:
+        asyncio.run(asyncio.wait_for(ping(), timeout=5))
+    except Exception as e:
+        if os.getenv("CI"):
+            pytest.fail(f"database not reachable: {e}")
+        pytest.skip(f"database not reachable: {e}")
+    return engine
+
+
+@pytest.fixture(scope="module")
+def query_counts(engine):
+    """QueryCount per operation for one create/update/get/delete round trip"""
+    from api.repositories.task_repository import TaskRepository, task_row
+
+    async def run():
+        # Open and register a pooled connection first so connect-time codec setup is not counted
+        async with engine.connect():
+            pass
+
+        results = {}
+        try:
+            with count_queries(engine) as results["create"]:
+                task = await request(lambda db: TaskRepository(db).create(
+                    task_row({"name": "Query count probe", "priority": "Low", "category": "Work"})
+                ))
+            with count_queries(engine) as results["update"]:
+                await request(lambda db: TaskRepository(db).update(task.id, {"priority": "High"}))
+            with count_queries(engine) as results["get"]:
+                await request(lambda db: TaskRepository(db).get_by_id(task.id))
+            with count_queries(engine) as results["delete"]:
+                await request(lambda db: TaskRepository(db).delete(task.id))
+        finally:
+            await engine.dispose()
+        return results
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("operation", BUDGETS)
+def test_query_budget(query_counts, operation):
+    max_statements, max_commits = BUDGETS[operation]
+    count = query_counts[operation]
+    assert count.statements <= max_statements, f"{operation}: {count.statements} statements"
+    assert count.commits <= max_commits, f"{operation}: {count.commits} commits"
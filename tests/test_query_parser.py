@@ -0,0 +1,38 @@
+"""
+The local search-query parser must never report high confidence for a query
+whose filters it dropped, or the LLM fallback is skipped and the search runs
+unfiltered.
+"""
+from datetime import date
+
+import pytest
+
+from api.config import settings
+from api.utils.query_parser import parse_search_query_locally
+
+TODAY = date(2026, 10, 14)
+
+
+@pytest.mark.parametrize("query, priority, category", [
+    ("high tasks", "High", None),
+    ("low work", "Low", "Work"),
+    ("show me medium personal tasks", "Medium", "Personal"),
+    ("high priority finance", "High", "Finance"),
+    ("priority: low work tasks", "Low", "Work"),
+    ("urgent tasks", "High", None),
+])
+def test_priority_is_extracted(query, priority, category):
+    filters, confidence = parse_search_query_locally(query, TODAY)
+    assert filters["priority"] == priority
+    assert filters["category"] == category
+    assert confidence >= settings.QUERY_FAST_PATH_MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize("query", [
+    "high and low tasks",
+    "important tasks for my boss",
+    "work tasks due in two weeks",
+])
+def test_unhandled_constraints_fall_back(query):
+    _, confidence = parse_search_query_locally(query, TODAY)
+    assert confidence < settings.QUERY_FAST_PATH_MIN_CONFIDENCE